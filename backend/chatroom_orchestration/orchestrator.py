@@ -270,10 +270,7 @@ class ChatOrchestrator:
             logger.info(f"❌ AGENT PROCESSING CANCELLED | Room: {room_id}")
             pass
         except Exception as e:
-            logger.error(f"💥 ERROR IN AGENT PROCESSING | Room: {room_id} | Error: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.error(f"💥 ERROR IN AGENT PROCESSING | Room: {room_id} | Error: {e}", exc_info=True)
         finally:
             # Clean up task tracking
             if room_id in self.active_room_tasks and self.active_room_tasks[room_id] == processing_task:
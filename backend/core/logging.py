@@ -6,6 +6,7 @@ Call setup_logging() once at application startup.
 """
 
 import logging
+import re
 import uuid
 from contextvars import ContextVar
 from typing import Optional
@@ -39,16 +40,27 @@ class CorrelationIdFilter(logging.Filter):
         return True
 
 
+# Endpoints polled by the frontend every few seconds
+_SUPPRESSED_PATHS = ("/messages/poll", "/chatting-agents")
+# One scan over the path instead of a substring search per suppressed endpoint
+_SUPPRESSED_PATH_RE = re.compile("|".join(re.escape(path) for path in _SUPPRESSED_PATHS))
+
+
 class SuppressPollingLogsFilter(logging.Filter):
     """Filter to suppress noisy polling endpoint logs."""
 
     def filter(self, record):
         """Filter out polling endpoint access logs."""
-        if hasattr(record, "getMessage"):
-            message = record.getMessage()
-            if "/messages/poll" in message or "/chatting-agents" in message:
-                return False
-        return True
+        # uvicorn.access logs with args (client_addr, method, full_path, http_version, status_code);
+        # match on the path directly so the message is not formatted just to be dropped
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and isinstance(args[2], str):
+            target = args[2]
+        elif not args and isinstance(record.msg, str):
+            target = record.msg
+        else:
+            target = record.getMessage()
+        return _SUPPRESSED_PATH_RE.search(target) is None
 
 
 def setup_logging(debug_mode: bool = True, log_level: Optional[int] = None, json_output: bool = False) -> None:
@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
 import uuid
 from typing import TYPE_CHECKING, AsyncIterator, Optional, Union
 
@@ -47,6 +48,9 @@ logging.getLogger("apscheduler").setLevel(logging.WARNING)
 
 logger = logging.getLogger("AgentManager")
 
+# Error text that marks a response as interrupted rather than failed
+_INTERRUPTION_RE = re.compile("interrupt|cancelled", re.IGNORECASE)
+
 
 class AgentManager:
     """Manages AI clients for agent response generation and interruption.
@@ -61,7 +65,7 @@ class AgentManager:
         # Client pools per provider type (lazy-loaded)
         self._client_pools: dict[ProviderType, ClientPoolInterface] = {}
         # Streaming state: tracks current thinking text per task during generation
-        self.streaming_state: dict[TaskIdentifier, dict] = {}
+        self.streaming_state: dict[TaskIdentifier, ResponseAccumulator] = {}
         # Event broadcaster for SSE streaming (optional, set via set_event_broadcaster)
         self.event_broadcaster: Optional[EventBroadcaster] = None
 
@@ -164,9 +168,9 @@ class AgentManager:
             Example: {1: {"thinking_text": "...", "response_text": "..."}}
         """
         result = {}
-        for task_id, state in self.streaming_state.items():
+        for task_id, accumulator in self.streaming_state.items():
             if task_id.room_id == room_id:
-                result[task_id.agent_id] = state
+                result[task_id.agent_id] = accumulator.get_streaming_state()
         return result
 
     def get_and_clear_streaming_state_for_room(self, room_id: int) -> dict[int, dict]:
@@ -185,12 +189,12 @@ class AgentManager:
         result = {}
         task_ids_to_clear = []
 
-        for task_id, state in self.streaming_state.items():
+        for task_id, accumulator in self.streaming_state.items():
             if task_id.room_id == room_id:
-                # Copy the state (don't just reference it)
+                state = accumulator.get_streaming_state()
                 result[task_id.agent_id] = {
-                    "thinking_text": state.get("thinking_text", ""),
-                    "response_text": state.get("response_text", ""),
+                    "thinking_text": state["thinking_text"],
+                    "response_text": state["response_text"],
                 }
                 task_ids_to_clear.append(task_id)
 
@@ -312,8 +316,7 @@ class AgentManager:
         Returns:
             True if the error is interruption-related
         """
-        error_str = str(error).lower()
-        return "interrupt" in error_str or "cancelled" in error_str
+        return _INTERRUPTION_RE.search(str(error)) is not None
 
     async def generate_sdk_response(self, context: AgentResponseContext) -> AsyncIterator[StreamEvent]:
         """
@@ -404,8 +407,8 @@ class AgentManager:
             self.active_clients[task_id] = client
             logger.debug(f"Registered client for task: {task_id}")
 
-            # Initialize streaming state for this task
-            self.streaming_state[task_id] = {"thinking_text": "", "response_text": ""}
+            # Expose the live accumulator for polling; its text is joined only when read
+            self.streaming_state[task_id] = accumulator
 
             # Calculate message length for logging
             if isinstance(message_to_send, list):
@@ -448,22 +451,26 @@ class AgentManager:
 
             # Get the parser for this provider
             stream_parser = provider.get_parser()
+            emits_deltas = stream_parser.emits_deltas
+            # Resolved once here rather than per streamed event
+            parse_message = stream_parser.parse_message
+            update_accumulator = accumulator.update_from_delta if emits_deltas else accumulator.update_from_parsed
 
             # Receive and stream the response
             async for message in client.receive_response():
-                # Parse the message and update accumulator
-                parsed = stream_parser.parse_message(message, accumulator.response_text, accumulator.thinking_text)
+                # Parse the message and update accumulator. Delta parsers get no
+                # accumulated text, so nothing re-copies the response per event.
+                if emits_deltas:
+                    parsed = parse_message(message, "", "")
+                else:
+                    parsed = parse_message(message, accumulator.response_text, accumulator.thinking_text)
 
                 # Log skip tool if just detected
                 if accumulator.skip_tool_capture and not accumulator.skip_tool_called:
                     logger.info("⏭️  Skip tool called")
 
                 # Update accumulator and get delta events
-                events = accumulator.update_from_parsed(parsed, temp_id)
-
-                # Update streaming state for polling access
-                if task_id in self.streaming_state:
-                    self.streaming_state[task_id] = accumulator.get_streaming_state()
+                events = update_accumulator(parsed, temp_id)
 
                 # Yield delta events and broadcast via SSE
                 for event in events:
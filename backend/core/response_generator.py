@@ -154,6 +154,9 @@ class ResponseGenerator:
         # Handle streaming response events with session recovery support
         response_text = ""
         thinking_text = ""
+        # Deltas are collected and joined once; repeated += copies long reasoning traces
+        response_parts: list[str] = []
+        thinking_parts: list[str] = []
         new_session_id = session_id
         memory_entries = []
         anthropic_calls = []
@@ -171,16 +174,16 @@ class ResponseGenerator:
                         stream_started = True
 
                     case ContentDeltaEvent(delta=delta):
-                        response_text += delta
+                        response_parts.append(delta)
 
                     case ThinkingDeltaEvent(delta=delta):
-                        thinking_text += delta
+                        thinking_parts.append(delta)
 
                     case StreamEndEvent() as end:
                         # Extract final data
                         end_event = end  # Store for SSE broadcast after save decision
-                        response_text = end.response_text or response_text
-                        thinking_text = end.thinking_text or thinking_text
+                        response_text = end.response_text or "".join(response_parts)
+                        thinking_text = end.thinking_text or "".join(thinking_parts)
                         new_session_id = end.session_id or session_id
                         memory_entries = end.memory_entries
                         anthropic_calls = end.anthropic_calls
@@ -232,15 +235,15 @@ class ResponseGenerator:
                         stream_started = True
 
                     case ContentDeltaEvent(delta=delta):
-                        response_text += delta
+                        response_parts.append(delta)
 
                     case ThinkingDeltaEvent(delta=delta):
-                        thinking_text += delta
+                        thinking_parts.append(delta)
 
                     case StreamEndEvent() as end:
                         end_event = end  # Store for SSE broadcast after save decision
-                        response_text = end.response_text or response_text
-                        thinking_text = end.thinking_text or thinking_text
+                        response_text = end.response_text or "".join(response_parts)
+                        thinking_text = end.thinking_text or "".join(thinking_parts)
                         new_session_id = end.session_id or session_id
                         memory_entries = end.memory_entries
                         anthropic_calls = end.anthropic_calls
@@ -248,6 +251,10 @@ class ResponseGenerator:
                         generated_images = end.generated_images
                         skipped = end.skipped
 
+        if end_event is None:
+            response_text = "".join(response_parts)
+            thinking_text = "".join(thinking_parts)
+
         # Memory entries are now written directly by the memorize tool
         # So we can skip this section (kept for reference/debugging)
         if memory_entries:
@@ -381,10 +388,7 @@ class ResponseGenerator:
             return True
 
         # Check text content - extract all text and filter header/footer
-        all_text = ""
-        for block in content_blocks:
-            if block.get("type") == "text":
-                all_text += block.get("text", "")
+        all_text = "".join(block.get("text", "") for block in content_blocks if block.get("type") == "text")
 
         context_lines = all_text.strip().split("\n")
 
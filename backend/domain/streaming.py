@@ -16,6 +16,13 @@ from providers.base import ParsedStreamMessage
 logger = logging.getLogger("streaming")
 
 
+def _joined(parts: list[str]) -> str:
+    """Join accumulated text chunks, collapsing them so repeated reads stay cheap."""
+    if len(parts) > 1:
+        parts[:] = ["".join(parts)]
+    return parts[0] if parts else ""
+
+
 @dataclass
 class StreamStartEvent:
     """Event emitted at the start of a streaming response."""
@@ -110,8 +117,6 @@ class ResponseAccumulator:
     Also provides capture lists for tool hooks.
     """
 
-    response_text: str = ""
-    thinking_text: str = ""
     session_id: Optional[str] = None
     skip_tool_called: bool = False
     memory_entries: list[str] = field(default_factory=list)
@@ -123,6 +128,19 @@ class ResponseAccumulator:
     # Streaming tool input accumulation (for input_json_delta support)
     _streaming_tool_blocks: dict[int, tuple[str, list[str]]] = field(default_factory=dict)
     # index -> (tool_name, [partial_json_chunks])
+    # Accumulated text as chunks, joined only when read (see response_text)
+    _response_parts: list[str] = field(default_factory=list)
+    _thinking_parts: list[str] = field(default_factory=list)
+
+    @property
+    def response_text(self) -> str:
+        """Accumulated response text."""
+        return _joined(self._response_parts)
+
+    @property
+    def thinking_text(self) -> str:
+        """Accumulated thinking text."""
+        return _joined(self._thinking_parts)
 
     def update_from_parsed(
         self,
@@ -138,12 +156,53 @@ class ResponseAccumulator:
         Returns:
             List of StreamEvent objects to yield to consumers
         """
-        events: list[StreamEvent] = []
-
         # Calculate deltas
         content_delta = parsed.response_text[len(self.response_text) :]
         thinking_delta = parsed.thinking_text[len(self.thinking_text) :]
 
+        # Update accumulated text
+        self._response_parts[:] = [parsed.response_text]
+        self._thinking_parts[:] = [parsed.thinking_text]
+
+        return self._apply_parsed(parsed, content_delta, thinking_delta, temp_id)
+
+    def update_from_delta(
+        self,
+        parsed: ParsedStreamMessage,
+        temp_id: str,
+    ) -> list[StreamEvent]:
+        """Update accumulator state from a message parsed with empty accumulated text.
+
+        For parsers with emits_deltas set, parsed.response_text/thinking_text hold
+        only this message's new text. It is appended rather than re-copied, so a
+        long response accumulates in linear time.
+
+        Args:
+            parsed: Parsed message from the stream parser (text fields are deltas)
+            temp_id: Temporary ID for this streaming session
+
+        Returns:
+            List of StreamEvent objects to yield to consumers
+        """
+        content_delta = parsed.response_text
+        thinking_delta = parsed.thinking_text
+        if content_delta:
+            self._response_parts.append(content_delta)
+        if thinking_delta:
+            self._thinking_parts.append(thinking_delta)
+
+        return self._apply_parsed(parsed, content_delta, thinking_delta, temp_id)
+
+    def _apply_parsed(
+        self,
+        parsed: ParsedStreamMessage,
+        content_delta: str,
+        thinking_delta: str,
+        temp_id: str,
+    ) -> list[StreamEvent]:
+        """Apply everything but the text from a parsed message and build delta events."""
+        events: list[StreamEvent] = []
+
         # Update session if found
         if parsed.session_id:
             self.session_id = parsed.session_id
@@ -184,10 +243,6 @@ class ResponseAccumulator:
             if idx in self._streaming_tool_blocks:
                 self._finalize_tool_block(idx)
 
-        # Update accumulated text
-        self.response_text = parsed.response_text
-        self.thinking_text = parsed.thinking_text
-
         # Create delta events
         # Don't yield content deltas after skip tool is called
         # (content after skip is the "reason for skipping" which should be hidden)
@@ -1,8 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Self
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TaskIdentifier:
     """Structured identifier for agent tasks.
 
@@ -11,6 +11,14 @@ class TaskIdentifier:
 
     room_id: int
     agent_id: int
+    # Hash computed once; instances key several pool dicts and are looked up often
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash((self.room_id, self.agent_id)))
+
+    def __hash__(self) -> int:
+        return self._hash
 
     def __str__(self) -> str:
         """Generate pool key for client pooling."""
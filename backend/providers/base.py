@@ -18,7 +18,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Mapping, Optional, Union
 
 if TYPE_CHECKING:
     from domain.contexts import AgentResponseContext
@@ -50,7 +50,7 @@ class SessionRecoveryError(Exception):
 
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedStreamMessage:
     """Structured result from parsing provider stream messages.
 
@@ -171,6 +171,11 @@ class AIStreamParser(ABC):
     provider-specific message formats to the unified ParsedStreamMessage.
     """
 
+    # True when parse_message's output depends only on the message itself, so a
+    # caller may pass empty accumulated text and receive just this message's text
+    # (see ResponseAccumulator.update_from_delta)
+    emits_deltas: bool = False
+
     @staticmethod
     @abstractmethod
     def parse_message(
@@ -328,11 +333,11 @@ class ClientPoolInterface(ABC):
 
     @property
     @abstractmethod
-    def pool(self) -> dict:
-        """Get the underlying pool dictionary.
+    def pool(self) -> Mapping[Any, AIClient]:
+        """Get a read-only view of the underlying pool dictionary.
 
         Returns:
-            Dict mapping task identifiers to clients
+            Mapping of task identifiers to clients
         """
         ...
 
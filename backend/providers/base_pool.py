@@ -10,7 +10,8 @@ from __future__ import annotations
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Generic, Tuple, TypeVar
+from types import MappingProxyType
+from typing import Any, Generic, Mapping, Tuple, TypeVar
 
 from domain.task_identifier import TaskIdentifier
 
@@ -48,15 +49,22 @@ class BaseClientPool(ClientPoolInterface, ABC, Generic[TClient, TOptions]):
     def __init__(self):
         """Initialize the client pool."""
         self._pool: dict[TaskIdentifier, TClient] = {}
+        # Read-only live view for callers; membership changes go through the pool
+        self._pool_view: Mapping[TaskIdentifier, TClient] = MappingProxyType(self._pool)
         self._connection_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CONNECTIONS)
         self._task_locks: dict[TaskIdentifier, asyncio.Lock] = {}
+        # Coroutines holding or waiting on each task lock; a lock is only dropped at zero
+        self._task_lock_users: dict[TaskIdentifier, int] = {}
+        # Secondary indices over pool keys, kept in step with _pool
+        self._by_room: dict[int, set[TaskIdentifier]] = {}
+        self._by_agent: dict[int, set[TaskIdentifier]] = {}
         self._cleanup_tasks: set[asyncio.Task] = set()
         self._logger = logging.getLogger(self._get_pool_name())
 
     @property
-    def pool(self) -> dict:
-        """Get the underlying pool dictionary."""
-        return self._pool
+    def pool(self) -> Mapping[TaskIdentifier, TClient]:
+        """Get a read-only view of the underlying pool dictionary."""
+        return self._pool_view
 
     def _get_task_lock(self, task_id: TaskIdentifier) -> asyncio.Lock:
         """Get or create a per-task_id lock."""
@@ -64,6 +72,41 @@ class BaseClientPool(ClientPoolInterface, ABC, Generic[TClient, TOptions]):
             self._task_locks[task_id] = asyncio.Lock()
         return self._task_locks[task_id]
 
+    def _index_task(self, task_id: TaskIdentifier) -> None:
+        """Add a pooled task to the room and agent indices."""
+        self._by_room.setdefault(task_id.room_id, set()).add(task_id)
+        self._by_agent.setdefault(task_id.agent_id, set()).add(task_id)
+
+    def _unindex_task(self, task_id: TaskIdentifier) -> None:
+        """Remove a task from the room and agent indices, dropping empty buckets."""
+        for index, key in ((self._by_room, task_id.room_id), (self._by_agent, task_id.agent_id)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(task_id)
+                if not bucket:
+                    del index[key]
+
+    def _discard_task_lock(self, task_id: TaskIdentifier) -> None:
+        """Drop a task's lock once its client is gone, unless a creator holds or awaits it.
+
+        lock.locked() alone isn't enough: it reads False between a release and the
+        next waiter waking up, and dropping the lock then would let a later caller
+        create a second client alongside that waiter's.
+        """
+        if task_id not in self._task_lock_users:
+            self._task_locks.pop(task_id, None)
+
+    def _release_task_lock_use(self, task_id: TaskIdentifier) -> None:
+        """Record that a get_or_create call is done with a task's lock."""
+        users = self._task_lock_users[task_id] - 1
+        if users:
+            self._task_lock_users[task_id] = users
+            return
+        del self._task_lock_users[task_id]
+        # Last user gone: keep the lock only while it guards a pooled client
+        if task_id not in self._pool:
+            self._task_locks.pop(task_id, None)
+
     # =========================================================================
     # Abstract methods - provider-specific implementations
     # =========================================================================
@@ -139,102 +182,142 @@ class BaseClientPool(ClientPoolInterface, ABC, Generic[TClient, TOptions]):
             (client, is_new) tuple
         """
         # Check if client exists (fast path)
-        if task_id in self._pool:
-            existing_client = self._pool[task_id]
-            old_session_id = self._get_session_id_from_client(existing_client)
-            new_session_id = self._get_session_id_from_options(options)
-
-            self._logger.debug(
-                f"Client exists for {task_id} | Old session: {old_session_id} | New session: {new_session_id}"
-            )
-
+        existing_client = self._pool.get(task_id)
+        if existing_client is not None:
             # If session changed, recreate the client
-            if old_session_id != new_session_id and (old_session_id is not None or new_session_id is not None):
+            if self._session_changed(task_id, existing_client, options):
                 self._logger.info(f"Session changed for {task_id}, recreating client")
                 self._remove_from_pool(task_id)
             else:
                 self._logger.debug(f"Reusing existing client for {task_id}")
-                self._pool[task_id].options = options
-                return self._pool[task_id], False
+                existing_client.options = options
+                return existing_client, False
 
         # Use per-task lock to prevent duplicate client creation
         task_lock = self._get_task_lock(task_id)
-        async with task_lock:
-            # Double-check after acquiring lock
-            if task_id in self._pool:
-                existing_client = self._pool[task_id]
-                old_session_id = self._get_session_id_from_client(existing_client)
-                new_session_id = self._get_session_id_from_options(options)
-
-                if old_session_id != new_session_id and (old_session_id is not None or new_session_id is not None):
-                    self._logger.info(f"Session changed for {task_id} while waiting for lock, recreating client")
-                    self._remove_from_pool(task_id)
-                else:
-                    self._logger.debug(f"Client for {task_id} was created while waiting for lock")
-                    self._pool[task_id].options = options
-                    return self._pool[task_id], False
-
-            # Use semaphore to limit overall connection concurrency
-            async with self._connection_semaphore:
-                self._logger.debug(f"Creating new client for {task_id}")
-                client = await self._create_client_impl(task_id, options)
-                self._pool[task_id] = client
-                return client, True
+        self._task_lock_users[task_id] = self._task_lock_users.get(task_id, 0) + 1
+        try:
+            async with task_lock:
+                # Double-check after acquiring lock
+                existing_client = self._pool.get(task_id)
+                if existing_client is not None:
+                    if self._session_changed(task_id, existing_client, options):
+                        self._logger.info(f"Session changed for {task_id} while waiting for lock, recreating client")
+                        self._remove_from_pool(task_id)
+                    else:
+                        self._logger.debug(f"Client for {task_id} was created while waiting for lock")
+                        existing_client.options = options
+                        return existing_client, False
+
+                # Use semaphore to limit overall connection concurrency
+                async with self._connection_semaphore:
+                    self._logger.debug(f"Creating new client for {task_id}")
+                    client = await self._create_client_impl(task_id, options)
+                    self._pool[task_id] = client
+                    self._index_task(task_id)
+                    return client, True
+        finally:
+            self._release_task_lock_use(task_id)
+
+    def _session_changed(self, task_id: TaskIdentifier, client: TClient, options: TOptions) -> bool:
+        """Check whether the requested session differs from the pooled client's."""
+        old_session_id = self._get_session_id_from_client(client)
+        new_session_id = self._get_session_id_from_options(options)
+        self._logger.debug(
+            f"Client exists for {task_id} | Old session: {old_session_id} | New session: {new_session_id}"
+        )
+        return old_session_id != new_session_id
+
+    def _detach_client(self, task_id: TaskIdentifier) -> TClient | None:
+        """Take a client out of the pool and its indices, returning it if present."""
+        client = self._pool.pop(task_id, None)
+        if client is not None:
+            self._unindex_task(task_id)
+            self._discard_task_lock(task_id)
+        return client
 
     def _remove_from_pool(self, task_id: TaskIdentifier):
         """Remove a client from the pool without calling disconnect."""
-        if task_id not in self._pool:
-            return
-        self._logger.info(f"Removing client from pool for {task_id}")
-        del self._pool[task_id]
+        if self._detach_client(task_id) is not None:
+            self._logger.info(f"Removing client from pool for {task_id}")
 
     async def cleanup(self, task_id: Any) -> None:
         """Remove and cleanup a specific client."""
-        if task_id not in self._pool:
+        self._schedule_cleanup(task_id)
+
+    def _schedule_cleanup(self, task_id: TaskIdentifier) -> None:
+        """Remove a client and start its disconnect in the background."""
+        client = self._detach_client(task_id)
+        if client is None:
             return
 
         self._logger.info(f"Cleaning up client for {task_id}")
-        client = self._pool[task_id]
-        del self._pool[task_id]
 
         # Schedule disconnect in background task
-        task = asyncio.create_task(self._disconnect_client_background(client, task_id))
+        self._track_cleanup_task(asyncio.create_task(self._disconnect_client_background(client, task_id)))
+
+    def _track_cleanup_task(self, task: asyncio.Task) -> None:
+        """Keep a cleanup task referenced until it finishes, so shutdown_all can await it."""
         self._cleanup_tasks.add(task)
-        task.add_done_callback(self._cleanup_tasks.discard)
+        task.add_done_callback(self._cleanup_task_done)
+
+    def _cleanup_task_done(self, task: asyncio.Task) -> None:
+        """Stop tracking a finished cleanup task and log its error, if any.
+
+        A disconnect that fails after its wait timed out has no awaiter left, so
+        its exception is retrieved here instead of surfacing as "never retrieved".
+        """
+        self._cleanup_tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and "cancel" not in str(error).lower():
+            self._logger.warning(f"Error in {task.get_name()}: {error}")
 
     async def cleanup_room(self, room_id: int) -> None:
         """Cleanup all clients for a specific room."""
-        tasks_to_cleanup = [task_id for task_id in self._pool.keys() if task_id.room_id == room_id]
-        for task_id in tasks_to_cleanup:
-            await self.cleanup(task_id)
+        for task_id in list(self._by_room.get(room_id, ())):
+            self._schedule_cleanup(task_id)
 
     async def shutdown_all(self) -> None:
         """Graceful shutdown of all clients."""
         self._logger.info(f"Shutting down {self._get_pool_name()} with {len(self._pool)} pooled clients")
 
-        task_ids = list(self._pool.keys())
-        for task_id in task_ids:
-            await self.cleanup(task_id)
+        # Disconnect everything still pooled in one task group, which holds the
+        # tasks itself and exits once each has finished or hit its timeout
+        async with asyncio.TaskGroup() as tg:
+            while self._pool:
+                task_id = next(iter(self._pool))
+                client = self._detach_client(task_id)
+                tg.create_task(self._disconnect_client_background(client, task_id))
 
+        # What's left are cleanups scheduled before shutdown and disconnects that
+        # outlived their timeout; give them one bounded wait rather than leaving them
         if self._cleanup_tasks:
             self._logger.info(f"Waiting for {len(self._cleanup_tasks)} cleanup tasks to complete")
-            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
+            await asyncio.wait(list(self._cleanup_tasks), timeout=self.DISCONNECT_TIMEOUT)
 
         self._logger.info(f"{self._get_pool_name()} shutdown complete")
 
     def get_keys_for_agent(self, agent_id: int) -> list[TaskIdentifier]:
         """Get all pool keys for a specific agent."""
-        return [task_id for task_id in self._pool.keys() if task_id.agent_id == agent_id]
+        return list(self._by_agent.get(agent_id, ()))
 
     def keys(self):
         """Get all pool keys."""
         return self._pool.keys()
 
     async def _disconnect_client_background(self, client: TClient, task_id: TaskIdentifier):
-        """Background task for client disconnection with timeout."""
+        """Background task for client disconnection with timeout.
+
+        The disconnect is shielded so a timeout doesn't interrupt it halfway, and
+        tracked so a slow one is still awaited by shutdown_all instead of orphaned.
+        """
+        disconnect = asyncio.create_task(client.disconnect(), name=f"disconnect of {task_id}")
+        self._track_cleanup_task(disconnect)
         try:
             await asyncio.wait_for(
-                asyncio.shield(client.disconnect()),
+                asyncio.shield(disconnect),
                 timeout=self.DISCONNECT_TIMEOUT,
             )
             self._logger.debug(f"Disconnected client for {task_id}")
@@ -242,7 +325,5 @@ class BaseClientPool(ClientPoolInterface, ABC, Generic[TClient, TOptions]):
             self._logger.warning(f"Timeout disconnecting client {task_id}")
         except asyncio.CancelledError:
             self._logger.debug(f"Disconnect cancelled for {task_id}")
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "cancel" not in error_msg:
-                self._logger.warning(f"Error disconnecting client {task_id}: {e}")
+        except Exception:
+            pass  # Logged by _cleanup_task_done, which also sees failures after a timeout
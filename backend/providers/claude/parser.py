@@ -117,6 +117,7 @@ class ClaudeStreamParser(AIStreamParser):
             # If so, skip adding text to avoid duplication
             skip_content = bool(current_response)
             skip_thinking = bool(current_thinking)
+            text_parts: list[str] = []
 
             for block in message.content:
                 # Check for memorize tool calls
@@ -136,7 +137,9 @@ class ClaudeStreamParser(AIStreamParser):
                 # Handle text blocks (skip if already streamed)
                 elif isinstance(block, TextBlock):
                     if not skip_content:
-                        content_delta += block.text
+                        text_parts.append(block.text)
+
+            content_delta = "".join(text_parts)
 
         # Return accumulated text with deltas applied
         return ParsedStreamMessage(
@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
 import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -28,6 +29,9 @@ from .parser import ClaudeStreamParser
 
 logger = logging.getLogger("ClaudeProvider")
 
+# Connect failures worth retrying (also covers "ProcessTransport is not ready")
+_TRANSPORT_ERROR_RE = re.compile("transport", re.IGNORECASE)
+
 
 
 class ClaudeClientPool(BaseClientPool[ClaudeClient, ClaudeAgentOptions]):
@@ -55,8 +59,9 @@ class ClaudeClientPool(BaseClientPool[ClaudeClient, ClaudeAgentOptions]):
 
     def _get_session_id_from_client(self, client: ClaudeClient) -> str | None:
         """Extract session ID from Claude client."""
-        if client.options:
-            return getattr(client.options, "resume", None)
+        options = client.options
+        if options:
+            return getattr(options, "resume", None)
         return None
 
     async def _create_client_impl(
@@ -79,10 +84,8 @@ class ClaudeClientPool(BaseClientPool[ClaudeClient, ClaudeAgentOptions]):
 
                 return client
             except Exception as e:
-                error_str = str(e)
-                if (
-                    "ProcessTransport is not ready" in error_str or "transport" in error_str.lower()
-                ) and attempt < max_retries - 1:
+                is_transport_error = isinstance(e, ConnectionError) or _TRANSPORT_ERROR_RE.search(str(e))
+                if is_transport_error and attempt < max_retries - 1:
                     delay = 0.3 * (2**attempt)
                     self._logger.warning(
                         f"Connection failed for {task_id}, retrying in {delay}s (attempt {attempt + 1}/{max_retries})"
@@ -9,11 +9,11 @@ The pool runs multiple server instances (configurable via CODEX_POOL_SIZE)
 for parallel request processing with thread ID affinity routing.
 """
 
+from importlib import import_module
+
 from providers.configs import CodexStartupConfig, CodexTurnConfig
 
 # App Server components
-from .app_server_client import CodexAppServerClient, CodexAppServerOptions
-from .app_server_instance import CodexAppServerInstance
 from .app_server_pool import CodexAppServerPool
 from .constants import (
     AppServerMethod,
@@ -25,9 +25,29 @@ from .parser import (
     AppServerStreamAccumulator,
     CodexStreamParser,
 )
-from .provider import CodexClientPool, CodexProvider
 from .thread_manager import ThreadSessionManager
 
+# Names whose modules import the codex SDK, loaded on first access so that
+# starting the (empty) pool at app startup doesn't pay for the SDK import
+_LAZY_EXPORTS = {
+    "CodexAppServerClient": ".app_server_client",
+    "CodexAppServerOptions": ".app_server_client",
+    "CodexAppServerInstance": ".app_server_instance",
+    "CodexClientPool": ".provider",
+    "CodexProvider": ".provider",
+}
+
+
+def __getattr__(name):
+    """Import SDK-backed exports on first access."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     # Provider
     "CodexProvider",
@@ -16,7 +16,7 @@ from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from providers.base import AIClient, SessionRecoveryError
 from providers.configs import CodexStartupConfig, CodexTurnConfig
 
-from .app_server_instance import CodexAppServerInstance
+from .app_server_instance import TRANSPORT_ERRORS, CodexAppServerInstance
 from .app_server_pool import CodexAppServerPool
 from .constants import (
     AppServerMethod,
@@ -64,6 +64,11 @@ class CodexAppServerClient(AIClient):
         await client.disconnect()
     """
 
+    # Attempts at starting a turn when the app-server transport drops before
+    # anything was streamed; each retry waits TURN_RETRY_DELAY * 2^n seconds
+    MAX_TURN_ATTEMPTS = 3
+    TURN_RETRY_DELAY = 0.5
+
     def __init__(self, options: CodexAppServerOptions):
         """Initialize with Codex App Server options."""
         self._options = options
@@ -72,23 +77,35 @@ class CodexAppServerClient(AIClient):
         self._thread_id: Optional[str] = options.thread_id
         self._pool: Optional[CodexAppServerPool] = None
         self._instance: Optional[CodexAppServerInstance] = None
+        self._instance_task: Optional[asyncio.Task] = None
+        # Turn config derived from options, reused while they describe the same turn
+        self._turn_config: Optional[CodexTurnConfig] = None
         self._interrupt_requested = False
         self._current_turn_task: Optional[asyncio.Task] = None
+        # Set once the app-server has accepted the current turn; from then on a
+        # transport failure must not resend the input, or the turn would run twice
+        self._turn_accepted = False
 
     async def connect(self) -> None:
         """Initialize the client by getting the App Server pool and instance.
 
         Gets or creates a dedicated app-server instance for this agent
-        with MCP configurations baked in at startup.
+        with MCP configurations baked in at startup. The instance is acquired
+        in the background so a cold process spawn overlaps with the caller
+        preparing its query; receive_response() waits for it.
         """
         self._pool = await CodexAppServerPool.get_instance()
         # Get or create instance for this agent
-        self._instance = await self._pool.get_or_create_instance(
-            agent_key=self._options.agent_key,
-            startup_config=self._options.startup_config,
+        self._instance_task = asyncio.create_task(
+            self._pool.get_or_create_instance(
+                agent_key=self._options.agent_key,
+                startup_config=self._options.startup_config,
+            )
         )
+        # Mark a failure as retrieved; it is re-raised when the task is awaited
+        self._instance_task.add_done_callback(lambda task: task.cancelled() or task.exception())
         self._connected = True
-        logger.debug(f"CodexAppServerClient connected to instance for {self._options.agent_key}")
+        logger.debug(f"CodexAppServerClient connected to pool for {self._options.agent_key}")
 
     async def disconnect(self) -> None:
         """Disconnect the client.
@@ -97,6 +114,7 @@ class CodexAppServerClient(AIClient):
         """
         self._connected = False
         self._pool = None
+        self._instance_task = None
         logger.debug("CodexAppServerClient disconnected")
 
     async def query(self, message: Union[str, AsyncIterator[dict], List[dict]]) -> None:
@@ -180,7 +198,8 @@ class CodexAppServerClient(AIClient):
                     # Use data URL (Codex docs: {"type": "image", "url": "..."})
                     data_url = f"data:{media_type};base64,{data}"
                     input_items.append({"type": "image", "url": data_url})
-                    logger.debug(f"Added image: {media_type}, {len(data)} chars base64")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Added image: {media_type}, {len(data)} chars base64")
 
         return input_items
 
@@ -204,8 +223,7 @@ class CodexAppServerClient(AIClient):
         if self._pending_input_items is None:
             raise RuntimeError("No pending input items. Call query() first.")
 
-        if self._instance is None:
-            raise RuntimeError("App Server instance not initialized")
+        await self._await_instance()
 
         input_items = self._pending_input_items
         self._pending_input_items = None
@@ -214,78 +232,136 @@ class CodexAppServerClient(AIClient):
         # Build config for the turn
         config = self._build_config()
 
-        # Log input summary
-        text_preview = ""
-        for item in input_items:
-            if item.get("type") == "text":
-                text_preview = item.get("text", "")[:100]
-                break
-        image_count = sum(1 for item in input_items if item.get("type") in ("localImage", "image"))
-        logger.info(
-            f"Starting App Server turn thread_id={self._thread_id}, "
-            f"items: {len(input_items)} ({image_count} images), text: {text_preview}..."
-        )
-
         try:
-            # Ensure we have a valid instance and thread (recovers/creates/resumes as needed)
-            async for event in self._ensure_valid_instance_and_thread(config):
-                yield event
-
-            # Ensure we have a valid thread_id at this point
-            thread_id = self._thread_id
-            if not thread_id:
-                raise RuntimeError("Failed to create thread")
-
-            # Use accumulator to collect streaming events
-            accumulator = AppServerStreamAccumulator()
-
-            # Stream turn events from instance
-            # The instance converts SDK notifications to internal event format:
-            # - Content events: {"type": "item.completed", "item": {...}} (agent_message, reasoning, tool_call)
-            # - Error events: {"type": "error", "data": {"message": ...}}
-            # - Turn lifecycle: {"method": "turn/started"|"turn/completed", "params": {...}}
-            async for event in self._instance.start_turn(thread_id, input_items, config):
-                if self._interrupt_requested:
-                    await self._instance.interrupt_turn(thread_id)
+            for attempt in range(1, self.MAX_TURN_ATTEMPTS + 1):
+                self._turn_accepted = False
+                try:
+                    # Ensure we have a valid instance and thread (recovers/creates/resumes as needed);
+                    # the common case of a live instance owning the thread needs no recovery
+                    if not self._has_valid_instance_and_thread():
+                        async for event in self._ensure_valid_instance_and_thread(config):
+                            yield event
+
+                    async for event in self._stream_turn(input_items, config):
+                        yield event
                     break
 
-                method = event.get("method", "")
-                if method:
-                    # Turn lifecycle events
-                    if method == AppServerMethod.TURN_STARTED:
-                        pass
-                    elif method == AppServerMethod.TURN_COMPLETED:
-                        accumulator.mark_completed()
-                        params = event.get("params", {})
-                        status = params.get("status", "")
-                        if status == "failed":
-                            yield error(f"Turn failed: {params.get('turnId', '')}")
-                else:
-                    # Content events (already in internal format from instance)
-                    yield event
-
-                if accumulator.is_completed:
-                    break
+                except TRANSPORT_ERRORS as e:
+                    # Only retry while the app-server hasn't accepted the turn yet
+                    if self._turn_accepted or attempt == self.MAX_TURN_ATTEMPTS:
+                        raise
+                    logger.warning(
+                        f"App Server transport lost for {self._options.agent_key} before the turn started "
+                        f"(attempt {attempt}/{self.MAX_TURN_ATTEMPTS}): {e}"
+                    )
+                    if self._instance:
+                        await self._instance.shutdown()
+                    await asyncio.sleep(self.TURN_RETRY_DELAY * 2 ** (attempt - 1))
 
         except SessionRecoveryError:
             # Let this propagate up to ResponseGenerator for retry with full history
             raise
 
+        except TRANSPORT_ERRORS as e:
+            # The app-server went away mid-turn; shut it down so it reads as unhealthy
+            # and the next turn gets a fresh instance instead of reusing a dead pipe
+            logger.warning(f"App Server transport lost for {self._options.agent_key}: {e}")
+            if self._instance:
+                await self._instance.shutdown()
+            yield error(str(e))
+
         except Exception as e:
             logger.error(f"Error in App Server turn: {e}")
             yield error(str(e))
 
+    async def _stream_turn(
+        self, input_items: List[Dict[str, Any]], config: CodexTurnConfig
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run one turn on the current instance and thread, yielding content events."""
+        # Ensure we have a valid thread_id at this point
+        thread_id = self._thread_id
+        if not thread_id:
+            raise RuntimeError("Failed to create thread")
+
+        # Use accumulator to collect streaming events
+        accumulator = AppServerStreamAccumulator()
+
+        # Stream turn events from instance
+        # The instance converts SDK notifications to internal event format:
+        # - Content events: {"type": "item.completed", "item": {...}} (agent_message, reasoning, tool_call)
+        # - Error events: {"type": "error", "data": {"message": ...}}
+        # - Turn lifecycle: {"method": "turn/started"|"turn/completed", "params": {...}}
+        async for event in self._instance.start_turn(thread_id, input_items, config):
+            if self._interrupt_requested:
+                await self._instance.interrupt_turn(thread_id)
+                break
+
+            method = event.get("method", "")
+            if method:
+                # Turn lifecycle events
+                if method == AppServerMethod.TURN_STARTED:
+                    # Emitted as soon as turn/start returns, before any content
+                    self._turn_accepted = True
+                elif method == AppServerMethod.TURN_COMPLETED:
+                    accumulator.mark_completed()
+                    params = event.get("params", {})
+                    status = params.get("status", "")
+                    if status == "failed":
+                        yield error(f"Turn failed: {params.get('turnId', '')}")
+            else:
+                # Content events (already in internal format from instance)
+                yield event
+
+            if accumulator.is_completed:
+                break
+
+    async def _await_instance(self) -> None:
+        """Wait for the instance acquisition started by connect().
+
+        If a previous acquisition failed, the instance is requested again.
+        """
+        task = self._instance_task
+        if task is not None:
+            self._instance_task = None
+            self._instance = await task
+
+        if self._instance is None:
+            if self._pool is None:
+                raise RuntimeError("App Server instance not initialized")
+            self._instance = await self._pool.get_or_create_instance(
+                agent_key=self._options.agent_key,
+                startup_config=self._options.startup_config,
+            )
+
     def _build_config(self) -> CodexTurnConfig:
         """Build the CodexTurnConfig for the turn.
 
+        The pool hands the client fresh options every turn, but they usually
+        carry the same prompt/model/cwd, so the previous config is reused
+        unless one of those changed.
+
         Note: MCP servers are now configured at app-server startup via
         startup_config, not passed per-turn.
         """
-        return CodexTurnConfig(
-            developer_instructions=self._options.system_prompt,
-            model=self._options.model,
-            cwd=self._options.cwd,
-        )
+        options = self._options
+        config = self._turn_config
+        if config is None or (config.developer_instructions, config.model, config.cwd) != (
+            options.system_prompt,
+            options.model,
+            options.cwd,
+        ):
+            config = self._turn_config = CodexTurnConfig(
+                developer_instructions=options.system_prompt,
+                model=options.model,
+                cwd=options.cwd,
+            )
+        return config
+
+    def _has_valid_instance_and_thread(self) -> bool:
+        """Check whether the turn can start without any recovery."""
+        instance = self._instance
+        thread_id = self._thread_id
+        return instance is not None and instance.is_healthy and bool(thread_id) and instance.owns_thread(thread_id)
 
     async def _ensure_valid_instance_and_thread(self, config: CodexTurnConfig) -> AsyncIterator[Dict[str, Any]]:
         """Ensure we have a valid instance and thread, recovering as needed.
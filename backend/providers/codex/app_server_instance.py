@@ -21,10 +21,12 @@ This module provides ChitChats-specific wrapping:
 """
 
 import asyncio
+import json
 import logging
+import os
 import shutil
 import time
-from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from typing import AbstractSet, Any, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
 
 from openai_codex import CodexConfig
 from openai_codex.async_client import AsyncCodexClient
@@ -38,8 +40,10 @@ from openai_codex.generated.v2_all import (
     ReasoningTextDeltaNotification,
     TurnCompletedNotification,
     TurnStartedNotification,
+    TurnStatus,
 )
 from openai_codex.models import Notification, UnknownNotification
+from pydantic import BaseModel, ValidationError
 
 from providers.configs import DEFAULT_CODEX_CONFIG, CodexStartupConfig, CodexTurnConfig
 
@@ -54,6 +58,29 @@ from .constants import (
 
 logger = logging.getLogger("CodexAppServerInstance")
 
+T = TypeVar("T")
+
+# Errors meaning the app-server transport is gone (process exited, pipe closed);
+# the instance can't be used again and must be replaced
+TRANSPORT_ERRORS = (TransportClosedError, ConnectionError, EOFError)
+
+# Extra environment for the app-server subprocess; the SDK layers this over
+# os.environ itself, so only overrides live here
+_CODEX_ENV: Dict[str, str] = {
+    "BROWSER": "",  # Prevent subprocess from opening browser
+}
+
+# Resolved `codex` executable, looked up once per process and shared by every instance
+_CODEX_PATH: Optional[str] = None
+
+
+def _get_codex_path() -> Optional[str]:
+    """Get the `codex` executable on PATH, caching a successful lookup."""
+    global _CODEX_PATH
+    if _CODEX_PATH is None:
+        _CODEX_PATH = shutil.which("codex")
+    return _CODEX_PATH
+
 
 def _image_urls_from_result(result: Any) -> List[str]:
     """Find generated-image URLs in an MCP tool result.
@@ -66,9 +93,11 @@ def _image_urls_from_result(result: Any) -> List[str]:
 
     from infrastructure.generated_images import extract_image_urls
 
+    if not isinstance(result, BaseModel):
+        return extract_image_urls(str(result))
     try:
-        raw = result.model_dump_json() if hasattr(result, "model_dump_json") else str(result)
-    except Exception:
+        raw = result.model_dump_json()
+    except ValueError:  # PydanticSerializationError on an unserializable content block
         raw = str(result)
 
     return extract_image_urls(raw)
@@ -88,6 +117,15 @@ class CodexAppServerInstance:
         await instance.shutdown()
     """
 
+    # Seconds to wait for a JSON-RPC response before treating the app-server as hung
+    RPC_TIMEOUT = 60.0
+    # Seconds to wait for the next notification of a running turn
+    TURN_IDLE_TIMEOUT = 120.0
+    # Seconds to wait for the SDK to close the process before killing it
+    SHUTDOWN_TIMEOUT = 5.0
+    # Seconds to wait for spawn + initialize handshake before giving up on a start
+    START_TIMEOUT = 30.0
+
     def __init__(
         self,
         instance_id: int,
@@ -98,9 +136,21 @@ class CodexAppServerInstance:
         self._startup_config = startup_config or DEFAULT_CODEX_CONFIG
         self._agent_key = agent_key
 
+        # thread/start params fixed by the startup config; per-thread values go on top
+        self._base_thread_params: Dict[str, Any] = {
+            "sandbox": self._startup_config.sandbox,
+            "approvalPolicy": self._startup_config.approval_policy,
+        }
+
         self._client: Optional[AsyncCodexClient] = None
-        self._active_threads: Set[str] = set()
-        self._current_turn_id: Optional[str] = None
+        self._start_lock = asyncio.Lock()
+        # turn/start params for the most recent turn config (the SDK copies them)
+        self._turn_params_config: Optional[CodexTurnConfig] = None
+        self._turn_params: Dict[str, Any] = {}
+        # Keyed by thread id; dict (not set) so active_threads can hand out a live read-only view
+        self._active_threads: Dict[str, None] = {}
+        # In-flight turn per thread; threads on one instance can run turns concurrently
+        self._turns_by_thread: Dict[str, str] = {}
 
         self._last_activity: float = time.monotonic()
         self._created_at: float = time.monotonic()
@@ -130,8 +180,8 @@ class CodexAppServerInstance:
         return len(self._active_threads)
 
     @property
-    def active_threads(self) -> Set[str]:
-        return self._active_threads.copy()
+    def active_threads(self) -> AbstractSet[str]:
+        return self._active_threads.keys()
 
     @property
     def agent_key(self) -> Optional[str]:
@@ -159,6 +209,32 @@ class CodexAppServerInstance:
             except ProcessLookupError:
                 pass
 
+    def pin_to_cpus(self, cpus: AbstractSet[int]) -> bool:
+        """Restrict the app-server process to a CPU set (Linux only).
+
+        sched_setaffinity applies per thread, so every thread the process has
+        already spawned is pinned; threads and MCP servers it starts later
+        inherit the mask.
+
+        Returns:
+            True if the process was pinned
+        """
+        pid = self.process_pid
+        if pid is None or not hasattr(os, "sched_setaffinity"):
+            return False
+        try:
+            tids = [int(tid) for tid in os.listdir(f"/proc/{pid}/task")]
+        except OSError:
+            tids = [pid]
+        try:
+            for tid in tids:
+                os.sched_setaffinity(tid, cpus)
+        except OSError as e:
+            logger.warning(f"[Instance {self._instance_id}] Failed to pin to CPUs {sorted(cpus)}: {e}")
+            return False
+        logger.info(f"[Instance {self._instance_id}] Pinned to CPUs {sorted(cpus)}")
+        return True
+
     def touch(self) -> None:
         self._last_activity = time.monotonic()
 
@@ -166,39 +242,69 @@ class CodexAppServerInstance:
         return thread_id in self._active_threads
 
     def register_thread(self, thread_id: str) -> None:
-        self._active_threads.add(thread_id)
+        self._active_threads[thread_id] = None
         logger.debug(f"[Instance {self._instance_id}] Registered thread {thread_id}")
 
     def release_thread(self, thread_id: str) -> bool:
         if thread_id in self._active_threads:
-            self._active_threads.discard(thread_id)
+            del self._active_threads[thread_id]
             logger.debug(f"[Instance {self._instance_id}] Released thread {thread_id}")
             return True
         return False
 
+    async def _rpc(self, method: str, request: Awaitable[T]) -> T:
+        """Await an SDK request, killing the app-server if it stops responding.
+
+        The SDK blocks a worker thread on the response, which cancellation can't
+        interrupt; killing the process closes stdout, which fails the pending
+        request and frees the thread. The instance then reads as unhealthy.
+
+        Raises:
+            RuntimeError: If no response arrives within RPC_TIMEOUT
+        """
+        try:
+            return await asyncio.wait_for(request, timeout=self.RPC_TIMEOUT)
+        except asyncio.TimeoutError as e:
+            logger.error(
+                f"[Instance {self._instance_id}] App Server did not respond to {method} "
+                f"within {self.RPC_TIMEOUT}s, killing it"
+            )
+            self.kill()
+            raise RuntimeError(f"{method} timed out after {self.RPC_TIMEOUT}s") from e
+
     def _build_sdk_config(self) -> CodexConfig:
         """Build CodexConfig for the official SDK.
 
         The SDK assembles the launch command itself: it renders each override as
         `--config key=value` and appends `app-server --listen stdio://`.
         """
-        codex_path = shutil.which("codex")
+        codex_path = _get_codex_path()
         if not codex_path:
             raise RuntimeError("Codex CLI not found. Install it with: npm install -g @openai/codex")
 
         return CodexConfig(
             codex_bin=codex_path,
             config_overrides=self._startup_config.to_config_overrides(),
-            env={"BROWSER": ""},  # Prevent subprocess from opening browser
+            env=_CODEX_ENV,
             client_name="chitchats",
             client_version="1.0.0",
         )
 
     async def start(self) -> None:
-        """Start the Codex App Server using the official SDK."""
+        """Start the Codex App Server using the official SDK.
+
+        Concurrent callers share one start: the process is spawned under
+        _start_lock, which only guards startup and never a running turn.
+        """
         if self.is_started:
             return
 
+        async with self._start_lock:
+            if not self.is_started:
+                await self._start_locked()
+
+    async def _start_locked(self) -> None:
+        """Spawn and initialize the app-server. Must be called with _start_lock held."""
         sdk_config = self._build_sdk_config()
 
         logger.info(
@@ -208,8 +314,25 @@ class CodexAppServerInstance:
 
         client = AsyncCodexClient(sdk_config)
         try:
-            await client.start()
-            await client.initialize()
+            async with asyncio.timeout(self.START_TIMEOUT):
+                await client.start()
+                await client.initialize()
+        except TimeoutError:
+            # A process that never answers initialize (e.g. noise on stdout) would
+            # otherwise hang this start and every caller queued behind _start_lock
+            # _stderr_tail is SDK-private; whatever it does, the process must still be closed
+            stderr_tail = None
+            try:
+                stderr_tail = client._sync._stderr_tail()
+            except Exception as e:
+                logger.debug(f"[Instance {self._instance_id}] Could not read app-server stderr: {e}")
+            finally:
+                await client.close()
+            logger.error(
+                f"[Instance {self._instance_id}] App server did not initialize within "
+                f"{self.START_TIMEOUT}s. stderr tail:\n{stderr_tail or '(empty)'}"
+            )
+            raise RuntimeError(f"Codex App Server startup timed out after {self.START_TIMEOUT}s")
         except Exception:
             await client.close()
             raise
@@ -222,24 +345,23 @@ class CodexAppServerInstance:
         if not self._client:
             raise RuntimeError("Instance not started")
 
-        params: Dict[str, Any] = {}
+        params = self._base_thread_params.copy()
         if config.cwd:
             params["cwd"] = config.cwd
         if config.model:
             params["model"] = config.model
         if config.developer_instructions:
             params["baseInstructions"] = config.developer_instructions
-        params["sandbox"] = self._startup_config.sandbox
-        params["approvalPolicy"] = self._startup_config.approval_policy
 
-        logger.debug(f"[Instance {self._instance_id}] Creating thread with params: {params}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # params carries the full system prompt; only render it when it will be shown
+            logger.debug(f"[Instance {self._instance_id}] Creating thread with params: {params}")
 
         try:
-            result = await self._client.thread_start(params)
-        except Exception as e:
-            if "validation error" in str(e).lower():
-                raise RuntimeError("코덱스 업데이트해주세요!") from e
-            raise
+            result = await self._rpc("thread/start", self._client.thread_start(params))
+        except ValidationError as e:
+            # The response no longer matches the SDK's schema: the CLI is out of date
+            raise RuntimeError("코덱스 업데이트해주세요!") from e
 
         thread_id = result.thread.id
         if not thread_id:
@@ -257,7 +379,7 @@ class CodexAppServerInstance:
         logger.debug(f"[Instance {self._instance_id}] Resuming thread {thread_id}")
 
         try:
-            result = await self._client.thread_resume(thread_id)
+            result = await self._rpc("thread/resume", self._client.thread_resume(thread_id))
             resumed_id = result.thread.id if result.thread else None
             if resumed_id:
                 self.register_thread(thread_id)
@@ -266,7 +388,9 @@ class CodexAppServerInstance:
             else:
                 logger.warning(f"[Instance {self._instance_id}] Resume returned no thread: {result}")
                 return False
-        except (CodexError, TransportClosedError) as e:
+        except TRANSPORT_ERRORS:
+            raise
+        except CodexError as e:
             logger.debug(f"[Instance {self._instance_id}] Failed to resume thread {thread_id}: {e}")
             return False
 
@@ -290,24 +414,33 @@ class CodexAppServerInstance:
 
         self.touch()
 
-        # Log input summary
-        text_items = [item.get("text", "")[:50] for item in input_items if item.get("type") == "text"]
-        image_count = sum(1 for item in input_items if item.get("type") in ("localImage", "image"))
-        logger.info(
-            f"[Instance {self._instance_id}] Starting turn on thread {thread_id}, "
-            f"items: {len(input_items)} ({image_count} images), "
-            f"text preview: {text_items[0] if text_items else '(no text)'}..."
-        )
-
-        # Build turn params
-        turn_params: Dict[str, Any] = {}
-        if config.developer_instructions:
-            turn_params["baseInstructions"] = config.developer_instructions
-        if config.model:
-            turn_params["model"] = config.model
+        # Log input summary (the one log line per turn); the scan over the input
+        # items only runs when INFO is actually emitted
+        if logger.isEnabledFor(logging.INFO):
+            text_preview = next(
+                (item.get("text", "")[:100] for item in input_items if item.get("type") == "text"), None
+            )
+            image_count = sum(1 for item in input_items if item.get("type") in ("localImage", "image"))
+            logger.info(
+                f"[Instance {self._instance_id}] Starting turn on thread {thread_id}, "
+                f"items: {len(input_items)} ({image_count} images), "
+                f"text preview: {text_preview if text_preview is not None else '(no text)'}..."
+            )
 
-        started = await client.turn_start(thread_id, input_items, params=turn_params)
+        # Build turn params (clients reuse their config object, so this is usually cached)
+        if config is not self._turn_params_config:
+            turn_params: Dict[str, Any] = {}
+            if config.developer_instructions:
+                turn_params["baseInstructions"] = config.developer_instructions
+            if config.model:
+                turn_params["model"] = config.model
+            self._turn_params_config = config
+            self._turn_params = turn_params
+        turn_params = self._turn_params
+
+        started = await self._rpc("turn/start", client.turn_start(thread_id, input_items, params=turn_params))
         turn_id = started.turn.id
+        self._turns_by_thread[thread_id] = turn_id
 
         # Everything this turn emits is routed to a dedicated queue, NOT the global
         # one `next_notification()` drains — without registering, the events pile up
@@ -328,12 +461,12 @@ class CodexAppServerInstance:
             # this turn's events, so any turn/completed is ours.
             while True:
                 try:
-                    notification = await asyncio.wait_for(client.next_turn_notification(turn_id), timeout=120.0)
+                    notification = await asyncio.wait_for(
+                        client.next_turn_notification(turn_id), timeout=self.TURN_IDLE_TIMEOUT
+                    )
                 except asyncio.TimeoutError:
                     logger.warning(f"[Instance {self._instance_id}] Turn timed out")
                     break
-                except TransportClosedError:
-                    break
 
                 event = self._notification_to_event(notification)
                 if event:
@@ -343,94 +476,111 @@ class CodexAppServerInstance:
                     break
         finally:
             client.unregister_turn_notifications(turn_id)
-            self._current_turn_id = None
+            if self._turns_by_thread.get(thread_id) == turn_id:
+                del self._turns_by_thread[thread_id]
             self.touch()
 
     def _notification_to_event(self, notification: Notification) -> Optional[Dict[str, Any]]:
         """Convert a typed SDK Notification to our internal event dict format."""
-        method = notification.method
-        payload = notification.payload
-
-        # Turn started
-        if method == "turn/started":
-            if isinstance(payload, TurnStartedNotification):
-                self._current_turn_id = payload.turn.id
-                return {"method": AppServerMethod.TURN_STARTED, "params": {"turnId": payload.turn.id}}
-            elif isinstance(payload, UnknownNotification):
-                turn_id = payload.params.get("turnId")
-                self._current_turn_id = turn_id
-                return {"method": AppServerMethod.TURN_STARTED, "params": {"turnId": turn_id}}
-
-        # Agent message delta (streaming text)
-        if method == "item/agentMessage/delta" and isinstance(payload, AgentMessageDeltaNotification):
-            return agent_message(payload.delta) if payload.delta else None
-
-        # Reasoning text delta (streaming thinking)
-        if method == "item/reasoning/textDelta" and isinstance(payload, ReasoningTextDeltaNotification):
-            return reasoning(payload.delta) if payload.delta else None
-
-        # Reasoning summary text delta
-        if method == "item/reasoning/summaryTextDelta" and isinstance(payload, ReasoningSummaryTextDeltaNotification):
-            return reasoning(payload.delta) if payload.delta else None
-
-        # Item completed (tool calls, final messages)
-        if method == "item/completed" and isinstance(payload, ItemCompletedNotification):
-            item = payload.item.root  # Unwrap RootModel
-            if isinstance(item, McpToolCallThreadItem):
-                # Parse arguments
-                args = item.arguments
-                if isinstance(args, str):
-                    import json
-                    try:
-                        args = json.loads(args)
-                    except (json.JSONDecodeError, TypeError):
-                        args = {}
-                args = args if isinstance(args, dict) else {}
-
-                # The image server saved the picture itself and reported the URL as text;
-                # surface it as a generated image so it rides along with the message.
+        handler = self._NOTIFICATION_HANDLERS.get(notification.method)
+        if handler is None:
+            # Other notifications (ignored for now)
+            return None
+        return handler(self, notification.payload)
+
+    def _on_turn_started(self, payload: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(payload, TurnStartedNotification):
+            turn_id = payload.turn.id
+        elif isinstance(payload, UnknownNotification):
+            turn_id = payload.params.get("turnId")
+        else:
+            return None
+        return {"method": AppServerMethod.TURN_STARTED, "params": {"turnId": turn_id}}
+
+    def _on_agent_message_delta(self, payload: Any) -> Optional[Dict[str, Any]]:
+        # Streaming text
+        if isinstance(payload, AgentMessageDeltaNotification) and payload.delta:
+            return agent_message(payload.delta)
+        return None
+
+    def _on_reasoning_delta(self, payload: Any) -> Optional[Dict[str, Any]]:
+        # Streaming thinking (raw reasoning text or its summary)
+        if (
+            isinstance(payload, (ReasoningTextDeltaNotification, ReasoningSummaryTextDeltaNotification))
+            and payload.delta
+        ):
+            return reasoning(payload.delta)
+        return None
+
+    def _on_item_completed(self, payload: Any) -> Optional[Dict[str, Any]]:
+        # Tool calls, generated images
+        if not isinstance(payload, ItemCompletedNotification):
+            return None
+
+        item = payload.item.root  # Unwrap RootModel
+        if isinstance(item, McpToolCallThreadItem):
+            # Parse arguments
+            args = item.arguments
+            if isinstance(args, str):
+                try:
+                    args = json.loads(args)
+                except (json.JSONDecodeError, TypeError):
+                    args = {}
+            args = args if isinstance(args, dict) else {}
+
+            # The image server saved the picture itself and reported the URL as text;
+            # surface it as a generated image so it rides along with the message.
+            # Only draw results carry one, so other tool results are never serialized.
+            if item.tool == "draw":
                 urls = _image_urls_from_result(item.result)
                 if urls:
                     return generated_image(urls[0], "image/png", args.get("prompt", ""))
 
-                return tool_call(item.tool, args)
+            return tool_call(item.tool, args)
 
-            if isinstance(item, ImageGenerationThreadItem):
-                # Codex generated an image. Persist to disk and emit an event.
-                from infrastructure.generated_images import save_generated_image
+        if isinstance(item, ImageGenerationThreadItem):
+            # Codex generated an image. Persist to disk and emit an event.
+            from infrastructure.generated_images import save_generated_image
+
+            saved = save_generated_image(item.result or "", media_type="image/png")
+            if saved is None:
+                logger.warning(
+                    f"[Instance {self._instance_id}] Failed to persist generated image "
+                    f"(id={item.id}, status={item.status})"
+                )
+                return None
+            url, media_type = saved
+            return generated_image(url, media_type, item.revised_prompt or "")
 
-                saved = save_generated_image(item.result or "", media_type="image/png")
-                if saved is None:
-                    logger.warning(
-                        f"[Instance {self._instance_id}] Failed to persist generated image "
-                        f"(id={item.id}, status={item.status})"
-                    )
-                    return None
-                url, media_type = saved
-                return generated_image(url, media_type, item.revised_prompt or "")
-
-        # Turn completed
-        if method == "turn/completed":
-            params: Dict[str, Any] = {}
-            if isinstance(payload, TurnCompletedNotification):
-                params["turnId"] = payload.turn.id
-                status = getattr(payload.turn, "status", None)
-                if status:
-                    status_val = status.value if hasattr(status, "value") else str(status)
-                    params["status"] = status_val
-                    if status_val == "failed":
-                        return error(f"Turn failed: {payload.turn.id}")
-            return {"method": AppServerMethod.TURN_COMPLETED, "params": params}
-
-        # Other notifications (ignored for now)
         return None
 
+    def _on_turn_completed(self, payload: Any) -> Optional[Dict[str, Any]]:
+        params: Dict[str, Any] = {}
+        if isinstance(payload, TurnCompletedNotification):
+            params["turnId"] = payload.turn.id
+            # Turn.status is a required TurnStatus enum in the generated schema
+            status = payload.turn.status
+            params["status"] = status.value
+            if status is TurnStatus.failed:
+                return error(f"Turn failed: {payload.turn.id}")
+        return {"method": AppServerMethod.TURN_COMPLETED, "params": params}
+
+    # Notification method -> handler, looked up once per notification
+    _NOTIFICATION_HANDLERS = {
+        AppServerMethod.TURN_STARTED: _on_turn_started,
+        AppServerMethod.AGENT_MESSAGE_DELTA: _on_agent_message_delta,
+        AppServerMethod.REASONING_DELTA: _on_reasoning_delta,
+        AppServerMethod.REASONING_SUMMARY_DELTA: _on_reasoning_delta,
+        AppServerMethod.ITEM_COMPLETED: _on_item_completed,
+        AppServerMethod.TURN_COMPLETED: _on_turn_completed,
+    }
+
     async def interrupt_turn(self, thread_id: str, turn_id: Optional[str] = None) -> bool:
         """Interrupt an ongoing turn."""
         if not self._client:
             return False
 
-        turn_id = turn_id or self._current_turn_id
+        turn_id = turn_id or self._turns_by_thread.get(thread_id)
         if not turn_id:
             logger.warning(f"[Instance {self._instance_id}] No turn to interrupt")
             return False
@@ -444,24 +594,21 @@ class CodexAppServerInstance:
             logger.error(f"[Instance {self._instance_id}] Interrupt failed: {e}")
             return False
 
-    async def restart(self) -> None:
-        """Restart the app server after a failure."""
-        logger.info(f"[Instance {self._instance_id}] Restarting Codex App Server...")
-        await self.shutdown()
-        await self.start()
-
     async def shutdown(self) -> None:
         """Gracefully shutdown the app server."""
         logger.info(f"[Instance {self._instance_id}] Shutting down...")
 
         if self._client:
             try:
-                await self._client.close()
+                await asyncio.wait_for(self._client.close(), timeout=self.SHUTDOWN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"[Instance {self._instance_id}] SDK client close timed out, killing process")
+                self.kill()
             except Exception as e:
                 logger.debug(f"[Instance {self._instance_id}] Error closing SDK client: {e}")
             self._client = None
 
         self._active_threads.clear()
-        self._current_turn_id = None
+        self._turns_by_thread.clear()
 
         logger.info(f"[Instance {self._instance_id}] Shutdown complete")
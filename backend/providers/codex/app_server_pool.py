@@ -9,25 +9,65 @@ Architecture:
     - Lazy creation: instances are spawned on first interaction
     - Idle timeout: instances are terminated after CODEX_IDLE_TIMEOUT seconds
     - Max instances: limited by CODEX_MAX_INSTANCES, oldest idle evicted when exceeded
+    - Bounded spawning: at most CODEX_MAX_CONCURRENT_STARTS processes boot at once
+    - Optional CPU pinning: CODEX_CPU_AFFINITY spreads instances across CPU groups
     - Thread resume: threads can be resumed even after instance restart
 """
 
+from __future__ import annotations
+
 import asyncio
+import atexit
 import logging
 import os
-from typing import Any, Dict, Optional
+import re
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional
 
 from providers.configs import CodexStartupConfig, CodexTurnConfig
 
-from .app_server_instance import CodexAppServerInstance
 from .thread_manager import ThreadSessionManager
 
+if TYPE_CHECKING:
+    # The instance module pulls in the codex SDK; it's imported on first spawn
+    from .app_server_instance import CodexAppServerInstance
+
 logger = logging.getLogger("CodexAppServerPool")
 
 # Default configuration
 DEFAULT_MAX_INSTANCES = 10
 DEFAULT_IDLE_TIMEOUT = 600  # seconds (10 minutes - suitable for interactive chat)
 DEFAULT_CLEANUP_INTERVAL = 60  # seconds
+DEFAULT_MAX_CONCURRENT_STARTS = 4  # app-server processes booting at once
+
+_CPU_GROUP_RE = re.compile(r"\[([^\]]*)\]")
+
+
+def _parse_cpu_groups(spec: str) -> List[FrozenSet[int]]:
+    """Parse CODEX_CPU_AFFINITY (e.g. "[0-3],[4-7]" or "[0,2],[1,3]") into CPU groups.
+
+    CPUs this process may not run on are dropped, and so are groups left empty.
+    """
+    if not spec.strip() or not hasattr(os, "sched_getaffinity"):
+        return []
+
+    available = os.sched_getaffinity(0)
+    groups: List[FrozenSet[int]] = []
+    for group_spec in _CPU_GROUP_RE.findall(spec):
+        cpus = set()
+        try:
+            for part in filter(None, (p.strip() for p in group_spec.split(","))):
+                first, _, last = part.partition("-")
+                cpus.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            logger.warning(f"Ignoring malformed CODEX_CPU_AFFINITY group: [{group_spec}]")
+            continue
+
+        unavailable = cpus - available
+        if unavailable:
+            logger.warning(f"CODEX_CPU_AFFINITY: CPUs {sorted(unavailable)} unavailable, dropping them")
+        if cpus & available:
+            groups.append(frozenset(cpus & available))
+    return groups
 
 
 class CodexAppServerPool:
@@ -66,10 +106,24 @@ class CodexAppServerPool:
         self._max_instances = int(os.environ.get("CODEX_MAX_INSTANCES", str(DEFAULT_MAX_INSTANCES)))
         self._idle_timeout = float(os.environ.get("CODEX_IDLE_TIMEOUT", str(DEFAULT_IDLE_TIMEOUT)))
         self._cleanup_interval = float(os.environ.get("CODEX_CLEANUP_INTERVAL", str(DEFAULT_CLEANUP_INTERVAL)))
+        self._max_concurrent_starts = int(
+            os.environ.get("CODEX_MAX_CONCURRENT_STARTS", str(DEFAULT_MAX_CONCURRENT_STARTS))
+        )
 
         # Per-agent instances: agent_key -> instance
         self._instances: Dict[str, CodexAppServerInstance] = {}
         self._instances_lock = asyncio.Lock()
+        # Per-agent creation locks, and how many instances are mid-start
+        self._agent_locks: Dict[str, asyncio.Lock] = {}
+        # Callers holding or waiting on each agent lock; a lock is only dropped at zero
+        self._agent_lock_users: Dict[str, int] = {}
+        self._starting_count = 0
+        # Caps simultaneous process spawns when many agents cold-start together
+        self._start_semaphore = asyncio.Semaphore(self._max_concurrent_starts)
+        # Optional CPU groups; each new instance runs on the group with fewest live instances
+        self._cpu_groups = _parse_cpu_groups(os.environ.get("CODEX_CPU_AFFINITY", ""))
+        # instance_id -> index into _cpu_groups, for mapped instances
+        self._cpu_group_by_instance: Dict[int, int] = {}
 
         # Thread session management (centralized)
         self._thread_manager = ThreadSessionManager()
@@ -88,10 +142,17 @@ class CodexAppServerPool:
         Returns:
             The singleton pool instance
         """
+        # Fast path: once created, callers never touch the lock
+        instance = cls._instance
+        if instance is not None:
+            return instance
+
         async with cls._lock:
             if cls._instance is None:
                 cls._instance = CodexAppServerPool()
                 cls._instance._start_cleanup_task()
+                # Last resort if the process exits without the lifespan shutdown running
+                atexit.register(cls._instance._kill_all)
             return cls._instance
 
     @classmethod
@@ -100,8 +161,16 @@ class CodexAppServerPool:
         async with cls._lock:
             if cls._instance is not None:
                 await cls._instance.shutdown()
+                atexit.unregister(cls._instance._kill_all)
                 cls._instance = None
 
+    def _kill_all(self) -> None:
+        """Kill every app-server process still running (sync, for interpreter exit)."""
+        for instance in list(self._instances.values()):
+            if instance.is_healthy:
+                logger.debug(f"Killing app-server for {instance.agent_key} at exit")
+                instance.kill()
+
     def _start_cleanup_task(self) -> None:
         """Start the background cleanup task."""
         if self._cleanup_task is None or self._cleanup_task.done():
@@ -127,7 +196,11 @@ class CodexAppServerPool:
                 break
 
     async def _cleanup_idle_instances(self) -> None:
-        """Terminate instances that have been idle too long."""
+        """Terminate instances that have been idle too long or whose process died.
+
+        Dead instances are reaped here so the next turn for that agent starts a
+        fresh process up front instead of discovering the dead one mid-request.
+        """
         if self._shutdown_event.is_set():
             return  # Don't cleanup during shutdown
 
@@ -135,30 +208,94 @@ class CodexAppServerPool:
             idle_keys = []
 
             for agent_key, instance in self._instances.items():
-                if instance.idle_seconds > self._idle_timeout:
+                if not instance.is_healthy or instance.idle_seconds > self._idle_timeout:
                     idle_keys.append(agent_key)
 
+            idle_instances = []
             for agent_key in idle_keys:
                 instance = self._instances.pop(agent_key)
-                logger.info(
-                    f"Terminating idle instance for {agent_key} "
-                    f"(idle {instance.idle_seconds:.1f}s > {self._idle_timeout}s)"
-                )
-                try:
-                    await instance.shutdown()
-                except Exception as e:
-                    logger.debug(f"Error shutting down instance {agent_key}: {e}")
+                self._discard_agent_lock(agent_key)
+                if instance.is_healthy:
+                    logger.info(
+                        f"Terminating idle instance for {agent_key} "
+                        f"(idle {instance.idle_seconds:.1f}s > {self._idle_timeout}s)"
+                    )
+                else:
+                    logger.warning(f"Reaping instance for {agent_key}: app-server process has exited")
+                idle_instances.append(instance)
+
+        # Unmapped already, so shut down outside the lock
+        await self._shutdown_instances(dict(zip(idle_keys, idle_instances)))
 
-            if idle_keys:
-                logger.info(f"Cleaned up {len(idle_keys)} idle instances")
+        if idle_keys:
+            logger.info(f"Cleaned up {len(idle_keys)} idle instances")
 
-    async def _evict_if_needed(self) -> None:
+    @staticmethod
+    async def _shutdown_instances(instances: Dict[str, CodexAppServerInstance]) -> None:
+        """Shut instances down concurrently; processes close independently."""
+
+        async def _shutdown_one(agent_key: str, instance: CodexAppServerInstance) -> None:
+            # Contain failures so one bad instance doesn't cancel its siblings
+            try:
+                await instance.shutdown()
+            except Exception as e:
+                logger.debug(f"Error shutting down instance {agent_key}: {e}")
+
+        async with asyncio.TaskGroup() as tg:
+            for agent_key, instance in instances.items():
+                tg.create_task(_shutdown_one(agent_key, instance))
+
+    def _get_agent_lock(self, agent_key: str) -> asyncio.Lock:
+        """Get or create the lock that serializes instance creation for one agent."""
+        lock = self._agent_locks.get(agent_key)
+        if lock is None:
+            lock = self._agent_locks[agent_key] = asyncio.Lock()
+        return lock
+
+    def _discard_agent_lock(self, agent_key: str) -> None:
+        """Drop an agent's lock once its instance is gone, unless a creator holds or awaits it."""
+        if agent_key not in self._agent_lock_users:
+            self._agent_locks.pop(agent_key, None)
+
+    def _release_agent_lock_use(self, agent_key: str) -> None:
+        """Record that a get_or_create_instance call is done with an agent's lock."""
+        users = self._agent_lock_users[agent_key] - 1
+        if users:
+            self._agent_lock_users[agent_key] = users
+            return
+        del self._agent_lock_users[agent_key]
+        # Last user gone: keep the lock only while it guards a mapped instance
+        if agent_key not in self._instances:
+            self._agent_locks.pop(agent_key, None)
+
+    def _assign_cpu_group(self, instance: CodexAppServerInstance) -> FrozenSet[int]:
+        """Pick the CPU group running the fewest mapped instances. Must hold _instances_lock.
+
+        Groups held by instances that have since been retired are freed first, so
+        evictions and recreations don't leave two instances sharing a group while
+        another sits idle.
+        """
+        live = {mapped.instance_id for mapped in self._instances.values()}
+        assigned = self._cpu_group_by_instance
+        for instance_id in [instance_id for instance_id in assigned if instance_id not in live]:
+            del assigned[instance_id]
+
+        usage = [0] * len(self._cpu_groups)
+        for index in assigned.values():
+            usage[index] += 1
+        index = usage.index(min(usage))
+        assigned[instance.instance_id] = index
+        return self._cpu_groups[index]
+
+    def _evict_if_needed(self) -> Optional[CodexAppServerInstance]:
         """Evict oldest idle instance if at max capacity.
 
-        Must be called with _instances_lock held.
+        Must be called with _instances_lock held. Instances still starting count
+        toward capacity. The evicted instance is returned so the caller can shut
+        it down after releasing the lock.
         """
-        if len(self._instances) < self._max_instances:
-            return
+        if len(self._instances) + self._starting_count < self._max_instances:
+            return None
 
         # Find the instance with oldest last_activity (most idle)
         oldest_key = None
@@ -169,10 +306,13 @@ class CodexAppServerPool:
                 oldest_time = instance.last_activity
                 oldest_key = agent_key
 
-        if oldest_key:
-            instance = self._instances.pop(oldest_key)
-            logger.info(f"Evicting instance for {oldest_key} to make room " f"(idle {instance.idle_seconds:.1f}s)")
-            await instance.shutdown()
+        if oldest_key is None:
+            return None
+
+        instance = self._instances.pop(oldest_key)
+        self._discard_agent_lock(oldest_key)
+        logger.info(f"Evicting instance for {oldest_key} to make room " f"(idle {instance.idle_seconds:.1f}s)")
+        return instance
 
     async def get_or_create_instance(
         self,
@@ -181,6 +321,11 @@ class CodexAppServerPool:
     ) -> CodexAppServerInstance:
         """Get existing instance or create new one for agent.
 
+        A live instance is returned without taking any lock. Creation is
+        serialized per agent. The pool-wide lock only guards the instance map
+        and is released while a process spawns, so cold starts for different
+        agents run concurrently.
+
         Args:
             agent_key: Unique identifier for the agent (e.g., "room_1_agent_5")
             startup_config: Configuration with MCP servers for this agent
@@ -188,36 +333,65 @@ class CodexAppServerPool:
         Returns:
             Running CodexAppServerInstance for the agent
         """
-        async with self._instances_lock:
-            # Return existing instance if available and healthy
-            if agent_key in self._instances:
-                instance = self._instances[agent_key]
-                if instance.is_healthy:
-                    instance.touch()
-                    return instance
-                else:
-                    # Unhealthy - remove and recreate
-                    logger.warning(f"Instance for {agent_key} is unhealthy, recreating")
-                    await instance.shutdown()
-                    del self._instances[agent_key]
-
-            # Evict if at capacity
-            await self._evict_if_needed()
-
-            # Create new instance
-            self._instance_counter += 1
-            instance = CodexAppServerInstance(
-                instance_id=self._instance_counter,
-                startup_config=startup_config,
-                agent_key=agent_key,
-            )
-
-            logger.info(f"Creating new instance {self._instance_counter} for {agent_key}")
-            await instance.start()
-
-            self._instances[agent_key] = instance
+        # Fast path: the map read and health check have no await, so no writer
+        # can interleave; warm turns never touch the agent or map locks
+        instance = self._instances.get(agent_key)
+        if instance is not None and instance.is_healthy:
+            instance.touch()
             return instance
 
+        agent_lock = self._get_agent_lock(agent_key)
+        self._agent_lock_users[agent_key] = self._agent_lock_users.get(agent_key, 0) + 1
+        try:
+            async with agent_lock:
+                retired: List[CodexAppServerInstance] = []
+
+                async with self._instances_lock:
+                    # Re-check under the locks: another caller may have created or retired it
+                    instance = self._instances.get(agent_key)
+                    if instance is not None:
+                        if instance.is_healthy:
+                            instance.touch()
+                            return instance
+                        # Unhealthy - remove and recreate
+                        logger.warning(f"Instance for {agent_key} is unhealthy, recreating")
+                        del self._instances[agent_key]
+                        retired.append(instance)
+
+                    # Evict if at capacity
+                    evicted = self._evict_if_needed()
+                    if evicted is not None:
+                        retired.append(evicted)
+
+                    # Create new instance
+                    from .app_server_instance import CodexAppServerInstance
+
+                    self._instance_counter += 1
+                    instance = CodexAppServerInstance(
+                        instance_id=self._instance_counter,
+                        startup_config=startup_config,
+                        agent_key=agent_key,
+                    )
+                    self._starting_count += 1
+
+                try:
+                    for old_instance in retired:
+                        await old_instance.shutdown()
+
+                    logger.info(f"Creating new instance {instance.instance_id} for {agent_key}")
+                    async with self._start_semaphore:
+                        await instance.start()
+                finally:
+                    self._starting_count -= 1
+
+                async with self._instances_lock:
+                    if self._cpu_groups:
+                        instance.pin_to_cpus(self._assign_cpu_group(instance))
+                    self._instances[agent_key] = instance
+                return instance
+        finally:
+            self._release_agent_lock_use(agent_key)
+
     async def get_instance_for_thread(
         self,
         thread_id: str,
@@ -235,8 +409,9 @@ class CodexAppServerPool:
         if agent_key is None:
             return None
 
-        async with self._instances_lock:
-            return self._instances.get(agent_key)
+        # A single dict read can't interleave with a writer (no await), so lookups
+        # don't queue behind _instances_lock
+        return self._instances.get(agent_key)
 
     def register_thread(
         self,
@@ -318,8 +493,7 @@ class CodexAppServerPool:
             try:
                 async with asyncio.timeout(10.0):  # 10 second timeout for all shutdowns
                     async with self._instances_lock:
-                        shutdown_tasks = [instance.shutdown() for instance in self._instances.values()]
-                        await asyncio.gather(*shutdown_tasks, return_exceptions=True)
+                        await self._shutdown_instances(self._instances)
                         self._instances.clear()
             except asyncio.TimeoutError:
                 logger.warning("Shutdown timed out, forcing cleanup")
@@ -333,6 +507,8 @@ class CodexAppServerPool:
                 self._instances.clear()
 
             self._thread_manager.clear_all()
+            for agent_key in list(self._agent_locks):
+                self._discard_agent_lock(agent_key)
 
             self._instance_counter = 0
             self._shutdown_event.clear()
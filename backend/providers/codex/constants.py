@@ -59,6 +59,7 @@ class AppServerMethod:
     # Streaming deltas
     AGENT_MESSAGE_DELTA = "item/agentMessage/delta"
     REASONING_DELTA = "item/reasoning/textDelta"
+    REASONING_SUMMARY_DELTA = "item/reasoning/summaryTextDelta"
 
 
 class TurnStatus:
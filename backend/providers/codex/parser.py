@@ -4,25 +4,22 @@ Codex stream parser implementation.
 This module parses events from Codex App Server and converts them
 to the unified ParsedStreamMessage format.
 
-App Server Streaming Format:
-    {"timestamp": "...", "type": "response_item", "payload": {...}}
-    {"timestamp": "...", "type": "response_completed", "payload": {...}}
-
-Event Types:
-    - response_item: A response item (message, tool call, etc.)
-        - payload.type = "message": Chat message
-            - payload.role = "assistant": Assistant response (what we want)
-            - payload.role = "user"/"developer": Context messages (skip)
-        - payload.content[]: Array of content blocks
-            - type = "output_text": Text response
-            - type = "reasoning": Thinking/reasoning text
-            - type = "tool_use": Tool call
-    - response_completed: Turn/response finished
+Stream Format:
+    The app-server instance converts SDK notifications into flat event dicts
+    (see the factory functions in constants.py):
+
+    {"type": "item.completed", "item": {...}}
+        - item.type = "agent_message": Response text
+        - item.type = "reasoning": Thinking/reasoning text
+        - item.type = "mcp_tool_call": Tool call (skip, memorize, ...)
+        - item.type = "generated_image": Image saved during the turn
+    {"type": "thread.started", "data": {"thread_id": ...}}
+    {"type": "error", "data": {"message": ...}}
 """
 
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping
 
 from providers.base import AIStreamParser, ParsedStreamMessage
 
@@ -30,150 +27,8 @@ from .constants import EventType, ItemType
 
 logger = logging.getLogger("CodexStreamParser")
 
-
-# =============================================================================
-# App Server Event Parsing
-# =============================================================================
-
-
-@dataclass
-class AppServerEvent:
-    """Parsed App Server streaming event."""
-
-    event_type: str  # "response_item", "response_completed", etc.
-    timestamp: Optional[str] = None
-
-    # For response_item events
-    payload_type: Optional[str] = None  # "message", "tool_use", etc.
-    role: Optional[str] = None  # "assistant", "user", "developer"
-    content_blocks: Optional[List[Dict[str, Any]]] = None
-
-    # Extracted content
-    text_delta: str = ""
-    reasoning_delta: str = ""
-    tool_calls: Optional[List[Dict[str, Any]]] = None
-
-    # Flags
-    is_completed: bool = False
-    is_assistant_message: bool = False
-
-
-def parse_streaming_event(raw_event: Dict[str, Any]) -> AppServerEvent:
-    """Parse a raw App Server streaming event.
-
-    Args:
-        raw_event: Raw event dict from App Server stdout
-
-    Returns:
-        Parsed AppServerEvent
-    """
-    event_type = raw_event.get("type", "")
-    timestamp = raw_event.get("timestamp")
-    payload = raw_event.get("payload", {})
-
-    event = AppServerEvent(
-        event_type=event_type,
-        timestamp=timestamp,
-    )
-
-    # Handle completion events
-    if event_type in ("response_completed", "turn_completed"):
-        event.is_completed = True
-        logger.debug(f"[AppServerParser] {event_type}")
-        return event
-
-    # Handle response_item format (messages with role)
-    if event_type == "response_item":
-        event.payload_type = payload.get("type", "")
-        event.role = payload.get("role", "")
-        event.content_blocks = payload.get("content", [])
-
-        # Only process assistant messages for response text
-        if event.payload_type == "message" and event.role == "assistant":
-            event.is_assistant_message = True
-            _extract_content(event)
-
-        logger.debug(
-            f"[AppServerParser] response_item: type={event.payload_type}, "
-            f"role={event.role}, is_assistant={event.is_assistant_message}"
-        )
-
-    # Handle event_msg format (direct message events)
-    elif event_type == "event_msg":
-        payload_type = payload.get("type", "")
-
-        if payload_type == "agent_message":
-            # This is the assistant's response
-            event.is_assistant_message = True
-            message = payload.get("message", "")
-            if message:
-                event.text_delta = message
-            logger.debug(f"[AppServerParser] event_msg/agent_message: {len(message)} chars")
-
-        elif payload_type == "agent_reasoning":
-            # Reasoning text
-            text = payload.get("text", "")
-            if text:
-                event.reasoning_delta = text
-            logger.debug(f"[AppServerParser] event_msg/agent_reasoning: {len(text)} chars")
-
-        elif payload_type == "turn_completed":
-            event.is_completed = True
-            logger.debug("[AppServerParser] event_msg/turn_completed")
-
-    return event
-
-
-def _extract_content(event: AppServerEvent) -> None:
-    """Extract text and reasoning from content blocks.
-
-    Args:
-        event: AppServerEvent to populate with extracted content
-    """
-    if not event.content_blocks:
-        return
-
-    text_parts: List[str] = []
-    reasoning_parts: List[str] = []
-    tool_calls: List[Dict[str, Any]] = []
-
-    for block in event.content_blocks:
-        block_type = block.get("type", "")
-
-        if block_type == "output_text":
-            text = block.get("text", "")
-            if text:
-                text_parts.append(text)
-
-        elif block_type == "text":
-            # Alternative text block format
-            text = block.get("text", "")
-            if text:
-                text_parts.append(text)
-
-        elif block_type == "reasoning":
-            text = block.get("text", "")
-            if text:
-                reasoning_parts.append(text)
-
-        elif block_type == "tool_use":
-            tool_calls.append({
-                "id": block.get("id", ""),
-                "name": block.get("name", ""),
-                "input": block.get("input", {}),
-            })
-
-    event.text_delta = "".join(text_parts)
-    event.reasoning_delta = "".join(reasoning_parts)
-    if tool_calls:
-        event.tool_calls = tool_calls
-
-    if event.text_delta:
-        logger.debug(f"[AppServerParser] Extracted text: {len(event.text_delta)} chars")
-    if event.reasoning_delta:
-        logger.debug(f"[AppServerParser] Extracted reasoning: {len(event.reasoning_delta)} chars")
-    if event.tool_calls:
-        logger.debug(f"[AppServerParser] Extracted {len(event.tool_calls)} tool calls")
+# Shared read-only default for missing sub-objects, so a miss allocates nothing
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
 
 
 # =============================================================================
@@ -187,9 +42,9 @@ class AppServerStreamAccumulator:
     Usage:
         accumulator = AppServerStreamAccumulator()
         for event in stream:
-            parsed = parse_streaming_event(event)
-            accumulator.add_event(parsed)
-            if parsed.is_completed:
+            if event is turn/completed:
+                accumulator.mark_completed()
+            if accumulator.is_completed:
                 break
         result = accumulator.get_result()
     """
@@ -201,24 +56,6 @@ class AppServerStreamAccumulator:
         self._tool_calls: List[Dict[str, Any]] = []
         self._completed = False
 
-    def add_event(self, event: AppServerEvent) -> None:
-        """Add a parsed event to the accumulator.
-
-        Args:
-            event: Parsed AppServerEvent
-        """
-        if event.is_completed:
-            self._completed = True
-            return
-
-        if event.is_assistant_message:
-            if event.text_delta:
-                self._text_parts.append(event.text_delta)
-            if event.reasoning_delta:
-                self._reasoning_parts.append(event.reasoning_delta)
-            if event.tool_calls:
-                self._tool_calls.extend(event.tool_calls)
-
     def add_text(self, text: str) -> None:
         """Add text directly (for JSON-RPC format).
 
@@ -280,144 +117,200 @@ class AppServerStreamAccumulator:
 # =============================================================================
 
 
-class CodexStreamParser(AIStreamParser):
-    """Parser for Codex events.
+def _on_content_delta(message: Dict[str, Any], response: str, thinking: str) -> ParsedStreamMessage:
+    # Streaming content delta
+    return ParsedStreamMessage(
+        response_text=response + message.get("delta", ""),
+        thinking_text=thinking,
+    )
 
-    Translates events from Codex App Server to the unified ParsedStreamMessage format.
-    """
 
-    @staticmethod
-    def parse_message(
-        message: Any,
-        current_response: str,
-        current_thinking: str,
-    ) -> ParsedStreamMessage:
-        """Parse a message from Codex.
+def _on_thinking_delta(message: Dict[str, Any], response: str, thinking: str) -> ParsedStreamMessage:
+    # Streaming thinking/reasoning delta
+    return ParsedStreamMessage(
+        response_text=response,
+        thinking_text=thinking + message.get("delta", ""),
+    )
 
-        Args:
-            message: Event dict from Codex
-            current_response: Accumulated response text so far
-            current_thinking: Accumulated thinking text so far
 
-        Returns:
-            ParsedStreamMessage with extracted fields and updated accumulated text
-        """
-        if not isinstance(message, dict):
-            return ParsedStreamMessage(
-                response_text=current_response,
-                thinking_text=current_thinking,
-            )
+def _on_thread_started(message: Dict[str, Any], response: str, thinking: str) -> ParsedStreamMessage:
+    # Extract thread_id for session resume
+    new_session_id = message.get("data", _EMPTY).get("thread_id")
+    logger.debug(f"[CodexParser] thread.started: session_id={new_session_id}")
+    return ParsedStreamMessage(
+        response_text=response,
+        thinking_text=thinking,
+        session_id=new_session_id,
+    )
 
-        event_type = message.get("type", "")
-        data = message.get("data", {})
 
-        logger.debug(f"[CodexParser] Event type: {event_type}")
+def _on_error(message: Dict[str, Any], response: str, thinking: str) -> ParsedStreamMessage:
+    data = message.get("data", {})
+    error_msg = data.get("message", str(data))
+    logger.error(f"[CodexParser] error: {error_msg}")
+    return ParsedStreamMessage(
+        response_text=response + f"Error: {error_msg}",
+        thinking_text=thinking,
+    )
+
+
+def _on_item_completed(message: Dict[str, Any], response: str, thinking: str) -> ParsedStreamMessage:
+    # Completed response item - extract content. Text is only concatenated on the
+    # side that actually changed; every other item passes the inputs through.
+    parsed = ParsedStreamMessage(response_text=response, thinking_text=thinking)
+
+    item = message.get("item", _EMPTY)
+    item_type = item.get("type", "")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[CodexParser] item.completed: item_type={item_type}")
+
+    handler = _ITEM_HANDLERS.get(item_type)
+    if handler is not None:
+        handler(item, parsed)
+    return parsed
+
+
+def _on_agent_message_item(item: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    # Direct text response
+    text = item.get("text", "")
+    if text:
+        parsed.response_text += text
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[CodexParser] Extracted agent_message: {len(text)} chars")
+
+
+def _on_reasoning_item(item: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    # Reasoning/thinking text
+    text = item.get("text", "")
+    if text:
+        parsed.thinking_text += text
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[CodexParser] Extracted reasoning: {len(text)} chars")
+
+
+def _on_generated_image_item(item: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    url = item.get("url", "")
+    media_type = item.get("media_type", "image/png")
+    prompt = item.get("prompt", "")
+    if url:
+        parsed.generated_images.append({
+            "url": url,
+            "media_type": media_type,
+            "prompt": prompt,
+        })
+        logger.info(f"[CodexParser] generated_image: {url}")
+
+
+def _on_mcp_tool_call_item(item: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    # One lookup on the bare tool name; tolerates server-prefixed names
+    tool_name = item.get("tool", "")
+    handler = _TOOL_HANDLERS.get(tool_name.rpartition("__")[2])
+    if handler is not None:
+        handler(item.get("arguments", _EMPTY), parsed)
+
+
+def _on_skip_tool(tool_args: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    parsed.skip_used = True
+    logger.info("[CodexParser] skip tool called")
+
+
+def _on_memorize_tool(tool_args: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    memory_entry = tool_args.get("memory_entry", "")
+    if memory_entry:
+        parsed.memory_entries.append(memory_entry)
+        logger.info(f"[CodexParser] memorize: {memory_entry[:50]}...")
+
+
+def _on_excuse_tool(tool_args: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    reason = tool_args.get("reason", "")
+    if reason:
+        parsed.excuse_reasons.append(reason)
+        logger.info(f"[CodexParser] excuse: {reason[:50]}...")
+
+
+def _on_openai_tool(tool_args: Dict[str, Any], parsed: ParsedStreamMessage) -> None:
+    situation = tool_args.get("situation", "")
+    if situation:
+        parsed.anthropic_calls.append(situation)
+        logger.info(f"[CodexParser] openai guideline: {situation[:50]}...")
+
 
-        content_delta = ""
-        thinking_delta = ""
-        new_session_id = None
-        skip_tool_called = False
-        memory_entries: list[str] = []
-        anthropic_calls: list[str] = []
-        excuse_reasons: list[str] = []
-        generated_images: list[dict[str, Any]] = []
-
-        if event_type == EventType.CONTENT_DELTA:
-            # Streaming content delta
-            content_delta = message.get("delta", "")
-            if content_delta:
-                return ParsedStreamMessage(
-                    response_text=current_response + content_delta,
-                    thinking_text=current_thinking,
-                )
-
-        elif event_type == EventType.THINKING_DELTA:
-            # Streaming thinking/reasoning delta
-            thinking_delta_text = message.get("delta", "")
-            if thinking_delta_text:
-                return ParsedStreamMessage(
-                    response_text=current_response,
-                    thinking_text=current_thinking + thinking_delta_text,
-                )
-
-        elif event_type == EventType.THREAD_STARTED:
-            # Extract thread_id for session resume
-            new_session_id = data.get("thread_id")
-            logger.debug(f"[CodexParser] thread.started: session_id={new_session_id}")
-
-        elif event_type == EventType.ITEM_COMPLETED:
-            # Completed response item - extract content
-            item = message.get("item", {})
-            item_type = item.get("type", "")
-
-            logger.debug(f"[CodexParser] item.completed: item_type={item_type}")
-
-            if item_type == ItemType.AGENT_MESSAGE:
-                # Direct text response
-                text = item.get("text", "")
-                if text:
-                    content_delta = text
-                    logger.debug(f"[CodexParser] Extracted agent_message: {len(text)} chars")
-
-            elif item_type == ItemType.REASONING:
-                # Reasoning/thinking text
-                text = item.get("text", "")
-                if text:
-                    thinking_delta = text
-                    logger.debug(f"[CodexParser] Extracted reasoning: {len(text)} chars")
-
-            elif item_type == ItemType.GENERATED_IMAGE:
-                url = item.get("url", "")
-                media_type = item.get("media_type", "image/png")
-                prompt = item.get("prompt", "")
-                if url:
-                    generated_images.append({
-                        "url": url,
-                        "media_type": media_type,
-                        "prompt": prompt,
-                    })
-                    logger.info(f"[CodexParser] generated_image: {url}")
-
-            elif item_type == ItemType.MCP_TOOL_CALL:
-                # Handle MCP tool calls
-                tool_name = item.get("tool", "")
-                tool_args = item.get("arguments", {})
-
-                if tool_name == "skip":
-                    skip_tool_called = True
-                    logger.info("[CodexParser] skip tool called")
-
-                elif tool_name == "memorize":
-                    memory_entry = tool_args.get("memory_entry", "")
-                    if memory_entry:
-                        memory_entries.append(memory_entry)
-                        logger.info(f"[CodexParser] memorize: {memory_entry[:50]}...")
-
-                elif tool_name == "excuse":
-                    reason = tool_args.get("reason", "")
-                    if reason:
-                        excuse_reasons.append(reason)
-                        logger.info(f"[CodexParser] excuse: {reason[:50]}...")
-
-                elif tool_name == "openai":
-                    situation = tool_args.get("situation", "")
-                    if situation:
-                        anthropic_calls.append(situation)
-                        logger.info(f"[CodexParser] openai guideline: {situation[:50]}...")
-
-        elif event_type == EventType.ERROR:
-            # Error event
-            error_msg = data.get("message", str(data))
-            logger.error(f"[CodexParser] error: {error_msg}")
-            content_delta = f"Error: {error_msg}"
+# Bare tool name -> handler for the tools whose calls feed the accumulator
+_TOOL_HANDLERS = {
+    "skip": _on_skip_tool,
+    "memorize": _on_memorize_tool,
+    "excuse": _on_excuse_tool,
+    "openai": _on_openai_tool,
+}
 
+
+# Item type -> handler for item.completed events
+_ITEM_HANDLERS = {
+    ItemType.AGENT_MESSAGE: _on_agent_message_item,
+    ItemType.REASONING: _on_reasoning_item,
+    ItemType.GENERATED_IMAGE: _on_generated_image_item,
+    ItemType.MCP_TOOL_CALL: _on_mcp_tool_call_item,
+}
+
+
+# Event type -> handler, looked up once per event. item.completed comes first:
+# the app-server instance delivers streamed text and reasoning as completed items.
+_EVENT_HANDLERS = {
+    EventType.ITEM_COMPLETED: _on_item_completed,
+    EventType.CONTENT_DELTA: _on_content_delta,
+    EventType.THINKING_DELTA: _on_thinking_delta,
+    EventType.THREAD_STARTED: _on_thread_started,
+    EventType.ERROR: _on_error,
+}
+
+
+def _parse_message(
+    message: Any,
+    current_response: str,
+    current_thinking: str,
+    _handlers: Dict[str, Any] = _EVENT_HANDLERS,
+) -> ParsedStreamMessage:
+    """Parse a message from Codex.
+
+    Args:
+        message: Event dict from Codex
+        current_response: Accumulated response text so far
+        current_thinking: Accumulated thinking text so far
+
+    Returns:
+        ParsedStreamMessage with extracted fields and updated accumulated text
+    """
+    if not isinstance(message, dict):
+        return ParsedStreamMessage(
+            response_text=current_response,
+            thinking_text=current_thinking,
+        )
+
+    event_type = message.get("type", "")
+
+    # Per-event logs are gated so the f-strings aren't built when debug is off
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[CodexParser] Event type: {event_type}")
+
+    handler = _handlers.get(event_type)
+    if handler is None:
         return ParsedStreamMessage(
-            response_text=current_response + content_delta,
-            thinking_text=current_thinking + thinking_delta,
-            session_id=new_session_id,
-            skip_used=skip_tool_called,
-            memory_entries=memory_entries,
-            anthropic_calls=anthropic_calls,
-            excuse_reasons=excuse_reasons,
-            generated_images=generated_images,
+            response_text=current_response,
+            thinking_text=current_thinking,
         )
+    return handler(message, current_response, current_thinking)
+
+
+class CodexStreamParser(AIStreamParser):
+    """Parser for Codex events.
+
+    Translates events from Codex App Server to the unified ParsedStreamMessage format.
+    """
+
+    # Every event carries its own text; nothing depends on what came before
+    emits_deltas = True
+
+    # Bound straight to the module function: the parser holds no state, and the
+    # handler table is prebound as a default argument
+    parse_message = staticmethod(_parse_message)
@@ -11,6 +11,9 @@ import asyncio
 import logging
 import shutil
 import tempfile
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -26,9 +29,6 @@ from .parser import CodexStreamParser
 
 logger = logging.getLogger("CodexProvider")
 
-# Cached working directory (created once per process)
-_CODEX_WORKING_DIR: str | None = None
-
 
 class CodexClientPool(BaseClientPool[AIClient, CodexAppServerOptions]):
     """Codex client pool for App Server mode.
@@ -49,8 +49,9 @@ class CodexClientPool(BaseClientPool[AIClient, CodexAppServerOptions]):
 
     def _get_session_id_from_client(self, client: AIClient) -> str | None:
         """Extract thread ID from Codex client."""
-        if client.options:
-            return client.options.thread_id
+        options = client.options
+        if options:
+            return options.thread_id
         return None
 
     async def _create_client_impl(
@@ -61,28 +62,47 @@ class CodexClientPool(BaseClientPool[AIClient, CodexAppServerOptions]):
         """Create and connect a new Codex App Server client.
 
         Simple creation without retry (App Server pool handles connection management).
+        Failures propagate to the response generator, which logs them.
         """
-        try:
-            client: AIClient = CodexAppServerClient(options)
-            await client.connect()
-            return client
-        except Exception as e:
-            self._logger.error(f"Failed to create Codex client for {task_id}: {e}")
-            raise
+        client: AIClient = CodexAppServerClient(options)
+        await client.connect()
+        return client
 
 
 def _get_codex_working_dir() -> str:
     """Get a valid working directory for Codex subprocess.
 
     Uses /tmp/codex-empty to provide an isolated, empty workspace.
-    The result is cached to avoid redundant filesystem operations.
+    CodexProvider calls this once and keeps the result.
+    """
+    temp_dir = Path(tempfile.gettempdir()) / "codex-empty"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return str(temp_dir)
+
+
+@lru_cache(maxsize=256)
+def _build_mcp_servers(
+    agent_name: str,
+    group_name: Optional[str],
+    agent_id: Optional[int],
+    config_file: Optional[str],
+    room_id: Optional[int],
+) -> Dict[str, Any]:
+    """Build the MCP server configs for one agent in one room.
+
+    The configs depend only on these arguments, so they are built once per agent
+    and room rather than on every turn. The returned dict is shared between
+    callers and must be treated as read-only.
     """
-    global _CODEX_WORKING_DIR
-    if _CODEX_WORKING_DIR is None:
-        temp_dir = Path(tempfile.gettempdir()) / "codex-empty"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        _CODEX_WORKING_DIR = str(temp_dir)
-    return _CODEX_WORKING_DIR
+    env_config = MCPServerEnv(
+        agent_name=agent_name,
+        provider="codex",
+        group_name=group_name,
+        agent_id=agent_id,
+        config_file=config_file,
+        room_id=room_id,
+    )
+    return MCPConfigBuilder.build_all_servers(env_config, include_etc=False, prefer_venv=True)
 
 
 class CodexProvider(AIProvider):
@@ -94,10 +114,22 @@ class CodexProvider(AIProvider):
     Note: Codex uses threads instead of sessions for conversation state.
     """
 
+    # Seconds a check_availability result is reused before probing the CLI again
+    AVAILABILITY_TTL = 30.0
+
+    # Most recently built options kept for reuse; see build_options
+    OPTIONS_CACHE_SIZE = 128
+
     def __init__(self):
         """Initialize the Codex provider."""
         self._parser = CodexStreamParser()
         self._pool: Optional[CodexClientPool] = None
+        # Fixed for the process, so resolve it once rather than per build_options
+        self._working_dir = _get_codex_working_dir()
+        # (checked_at, available) from the last CLI probe; see check_availability
+        self._availability: Optional[tuple[float, bool]] = None
+        # Inputs -> built options, least recently used first
+        self._options_cache: OrderedDict[tuple, CodexAppServerOptions] = OrderedDict()
 
     @property
     def provider_type(self) -> ProviderType:
@@ -142,36 +174,59 @@ class CodexProvider(AIProvider):
         _ = excuse_reasons_capture
         _ = generated_images_capture
 
+        # MCP server inputs, in _build_mcp_servers argument order
+        mcp_tools = base_options.mcp_tools
+        if mcp_tools:
+            agent_id = mcp_tools.get("agent_id")
+            room_id = mcp_tools.get("room_id")
+            tool_env = (
+                mcp_tools.get("agent_name", "Agent"),
+                mcp_tools.get("agent_group"),
+                agent_id,
+                mcp_tools.get("config_file"),
+                room_id,
+            )
+        else:
+            agent_id = room_id = None
+            tool_env = None
+
+        # The options depend only on these inputs and are never mutated, so a turn
+        # repeating an earlier one's inputs gets the same object back
+        cache_key = (
+            base_options.system_prompt,
+            base_options.model,
+            base_options.session_id,
+            base_options.working_dir,
+            tool_env,
+        )
+        cached = self._options_cache.get(cache_key)
+        if cached is not None:
+            self._options_cache.move_to_end(cache_key)
+            return cached
+
         # Build agent key for instance identification
-        agent_id = base_options.mcp_tools.get("agent_id") if base_options.mcp_tools else None
-        room_id = base_options.mcp_tools.get("room_id") if base_options.mcp_tools else None
         agent_key = f"room_{room_id}_agent_{agent_id}" if room_id and agent_id else "default"
 
         # Build MCP servers for startup config (passed via -c flags)
-        mcp_servers: Dict[str, Any] = {}
-        if base_options.mcp_tools:
-            env_config = MCPServerEnv(
-                agent_name=base_options.mcp_tools.get("agent_name", "Agent"),
-                provider="codex",
-                group_name=base_options.mcp_tools.get("agent_group"),
-                agent_id=base_options.mcp_tools.get("agent_id"),
-                config_file=base_options.mcp_tools.get("config_file"),
-                room_id=base_options.mcp_tools.get("room_id"),
-            )
-            mcp_servers = MCPConfigBuilder.build_all_servers(env_config, include_etc=False, prefer_venv=True)
+        mcp_servers: Dict[str, Any] = _build_mcp_servers(*tool_env) if tool_env else {}
 
         # Build startup config with MCP servers (passed via -c flags at startup)
         startup_config = CodexStartupConfig(mcp_servers=mcp_servers)
 
-        return CodexAppServerOptions(
+        options = CodexAppServerOptions(
             agent_key=agent_key,
             startup_config=startup_config,
             system_prompt=base_options.system_prompt,
             model=base_options.model if base_options.model else None,
             thread_id=base_options.session_id,  # Codex uses thread_id
-            cwd=base_options.working_dir or _get_codex_working_dir(),
+            cwd=base_options.working_dir or self._working_dir,
         )
 
+        self._options_cache[cache_key] = options
+        if len(self._options_cache) > self.OPTIONS_CACHE_SIZE:
+            self._options_cache.popitem(last=False)
+        return options
+
     def get_parser(self) -> AIStreamParser:
         """Get the stream parser for Codex messages."""
         return self._parser
@@ -179,9 +234,23 @@ class CodexProvider(AIProvider):
     async def check_availability(self) -> bool:
         """Check if Codex CLI is available and authenticated.
 
+        The result is cached for AVAILABILITY_TTL seconds so that polling
+        (e.g. the providers endpoint) doesn't spawn a subprocess per call.
+
         Returns:
             True if Codex CLI is installed and authenticated
         """
+        now = time.monotonic()
+        cached = self._availability
+        if cached is not None and now - cached[0] < self.AVAILABILITY_TTL:
+            return cached[1]
+
+        available = await self._probe_availability()
+        self._availability = (now, available)
+        return available
+
+    async def _probe_availability(self) -> bool:
+        """Run the actual CLI checks behind check_availability."""
         # Check if codex is installed via npm
         codex_path = shutil.which("codex")
         if not codex_path:
@@ -190,8 +259,9 @@ class CodexProvider(AIProvider):
 
         # Check if authenticated using "codex login status"
         try:
+            # Run the binary found above rather than resolving "codex" on PATH again
             process = await asyncio.create_subprocess_exec(
-                "codex",
+                codex_path,
                 "login",
                 "status",
                 stdout=asyncio.subprocess.PIPE,
@@ -201,10 +271,10 @@ class CodexProvider(AIProvider):
 
             # Exit code 0 = logged in, non-zero = not logged in
             if process.returncode == 0:
-                output = stdout.decode("utf-8").lower()
-                if "logged in" in output:
+                # Match on the raw bytes; only decode for the log when it's unclear
+                if b"logged in" in stdout.lower():
                     return True
-                logger.warning(f"Codex login status unclear: {output}")
+                logger.warning(f"Codex login status unclear: {stdout.decode('utf-8', errors='replace')}")
                 return False
 
             logger.info("Codex not logged in")
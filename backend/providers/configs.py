@@ -6,7 +6,8 @@ separating static/startup settings from dynamic per-session settings.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 # =============================================================================
 # Claude Provider Configs
@@ -89,6 +90,42 @@ class ClaudeSessionConfig:
 # =============================================================================
 
 
+# Default `codex app-server` overrides (passed via -c key=value). Defined once and
+# shared read-only by every CodexStartupConfig that doesn't pass its own mapping.
+_DEFAULT_CODEX_CONFIG_OVERRIDES: Mapping[str, Any] = MappingProxyType(
+    {
+        # Feature flags
+        "features.shell_tool": False,  # Disables: shell, local_shell, container.exec, shell_command
+        "features.unified_exec": False,  # Disables: exec_command, write_stdin
+        "features.apply_patch_freeform": False,  # Disables: apply_patch
+        "features.collaboration_modes": False,  # Disables: apply_patch
+        "features.request_rule": False,  # Disables: apply_patch
+        "features.powershell_utf8": False,  # Disables: apply_patch
+        "features.collab": False,  # Disables: spawn_agent, send_input, wait, close_agent
+        "features.child_agents_md": False,  # Disables child agents markdown
+        "features.enable_request_compression": False,
+        "features.skill_mcp_dependency_install": False,
+        # Built-in image generation is replaced by our image MCP server, which weaves each
+        # character's registered appearance into the prompt (see mcp_servers/image_server.py).
+        "features.image_generation": False,
+        "features.memories": False,
+        "features.apps": False,
+        "features.fast_mode": False,
+        "features.multi_agent": False,
+        # Tool settings
+        "include_apply_patch_tool": False,
+        "tools_view_image": False,  # Agents receive images directly
+        "web_search": "disabled",
+        # "project_doc_max_bytes": 0,
+        "show_raw_agent_reasoning": True,
+        "model_verbosity": "medium",
+        "model_reasoning_summary": "detailed",
+        "personality": "none",
+        "model_reasoning_effort": "xhigh",
+    }
+)
+
+
 @dataclass
 class CodexStartupConfig:
     """Configuration passed to `codex app-server` at launch time.
@@ -105,39 +142,10 @@ class CodexStartupConfig:
     # "danger-full-access" = no sandbox restrictions
     sandbox: str = "danger-full-access"
 
-    # Config overrides (passed via -c key=value)
-    config_overrides: Dict[str, Any] = field(
-        default_factory=lambda: {
-            # Feature flags
-            "features.shell_tool": False,  # Disables: shell, local_shell, container.exec, shell_command
-            "features.unified_exec": False,  # Disables: exec_command, write_stdin
-            "features.apply_patch_freeform": False,  # Disables: apply_patch
-            "features.collaboration_modes": False,  # Disables: apply_patch
-            "features.request_rule": False,  # Disables: apply_patch
-            "features.powershell_utf8": False,  # Disables: apply_patch
-            "features.collab": False,  # Disables: spawn_agent, send_input, wait, close_agent
-            "features.child_agents_md": False,  # Disables child agents markdown
-            "features.enable_request_compression": False,
-            "features.skill_mcp_dependency_install": False,
-            # Built-in image generation is replaced by our image MCP server, which weaves each
-            # character's registered appearance into the prompt (see mcp_servers/image_server.py).
-            "features.image_generation": False,
-            "features.memories": False,
-            "features.apps": False,
-            "features.fast_mode": False,
-            "features.multi_agent": False,
-            # Tool settings
-            "include_apply_patch_tool": False,
-            "tools_view_image": False,  # Agents receive images directly
-            "web_search": "disabled",
-            # "project_doc_max_bytes": 0,
-            "show_raw_agent_reasoning": True,
-            "model_verbosity": "medium",
-            "model_reasoning_summary": "detailed",
-            "personality": "none",
-            "model_reasoning_effort": "xhigh",
-        }
-    )
+    # Config overrides (passed via -c key=value). The factory hands out the shared
+    # read-only defaults, not a copy. A plain default isn't allowed on Python 3.11:
+    # mappingproxy is unhashable there, so dataclasses treat it as mutable
+    config_overrides: Mapping[str, Any] = field(default_factory=lambda: _DEFAULT_CODEX_CONFIG_OVERRIDES)
 
     # MCP server configurations (rendered as mcp_servers.* overrides)
     # Format: {"server_name": {"command": "...", "args": [...], "env": {...}, "cwd": "..."}}
@@ -10,6 +10,7 @@ from __future__ import annotations
 import os
 import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -134,9 +135,12 @@ class MCPConfigBuilder:
         return servers
 
     @staticmethod
+    @lru_cache(maxsize=2)
     def _get_python_executable(prefer_venv: bool = False) -> str:
         """Get the Python executable path.
 
+        Resolved once per process for each flag; VIRTUAL_ENV doesn't change at runtime.
+
         Args:
             prefer_venv: If True, prefer virtualenv Python if available
 
@@ -160,6 +164,10 @@ class MCPConfigBuilder:
             "AGENT_NAME": env_config.agent_name,
             "PROVIDER": env_config.provider,
             "PYTHONPATH": backend_dir,
+            # Servers speak JSON-RPC over stdout: don't let it sit in a block buffer,
+            # and keep Korean text intact regardless of the host's locale (Windows)
+            "PYTHONUNBUFFERED": "1",
+            "PYTHONIOENCODING": "utf-8",
         }
         if env_config.group_name:
             env["AGENT_GROUP"] = env_config.group_name
@@ -29,6 +29,10 @@ _DEFAULT_PROVIDER = "claude"
 # are deliberately left in place — they are filled per agent and per room later.
 _OVERLAY_KEYS = ("vendor", "model_name", "policy_tool", "provider_sections", "provider_notes")
 
+# provider -> (provider config, base config, rendered prompt). The YAML cache hands
+# back the same dicts until a file changes, so identity says the render is current.
+_rendered_prompts: Dict[str, tuple[Dict[str, Any], Dict[str, Any], str]] = {}
+
 
 def _resolve_provider(provider: str) -> str:
     if provider in _PROVIDER_PROMPT_PATHS:
@@ -97,6 +101,10 @@ def get_base_system_prompt(provider: str = _DEFAULT_PROVIDER) -> str:
         provider_config = load_provider_prompts(provider)
         base_config = load_base_prompts()
 
+        cached = _rendered_prompts.get(provider)
+        if cached is not None and cached[0] is provider_config and cached[1] is base_config:
+            return cached[2]
+
         active_key = provider_config.get("active_system_prompt") or base_config.get(
             "active_system_prompt", "system_prompt_v8"
         )
@@ -104,7 +112,9 @@ def get_base_system_prompt(provider: str = _DEFAULT_PROVIDER) -> str:
         # Provider-local override wins; otherwise use the shared base.
         template = provider_config.get(active_key) or base_config.get(active_key)
         if template and isinstance(template, str):
-            return _apply_overlay(template, provider_config.get("overlay", {}))
+            rendered = _apply_overlay(template, provider_config.get("overlay", {}))
+            _rendered_prompts[provider] = (provider_config, base_config, rendered)
+            return rendered
 
         logger.warning(f"System prompt '{active_key}' not found for provider '{provider}', using fallback")
         return DEFAULT_FALLBACK_PROMPT
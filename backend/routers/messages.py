@@ -234,10 +234,7 @@ async def send_message(
                     saved_user_message_id=saved_message.id,  # Pass the message ID to prevent duplication
                 )
             except Exception as e:
-                logger.error(f"Error triggering agent responses: {e}")
-                import traceback
-
-                traceback.print_exc()
+                logger.error(f"Error triggering agent responses: {e}", exc_info=True)
             finally:
                 pass  # Session cleanup handled by generator
             break  # Only use first (and only) session
@@ -0,0 +1,248 @@
+"""
+Tests for BaseClientPool.
+
+Uses a minimal pool subclass whose clients record disconnects and whose
+creation can be held open, so interleavings with cleanup can be driven
+deterministically.
+"""
+
+import asyncio
+
+from domain.task_identifier import TaskIdentifier
+from providers.base_pool import BaseClientPool
+
+
+class FakeClient:
+    """Client stub carrying its options (the session id) and a disconnect count."""
+
+    def __init__(self, options: str):
+        self.options = options
+        self.disconnects = 0
+
+    async def disconnect(self) -> None:
+        self.disconnects += 1
+
+
+class FakePool(BaseClientPool):
+    """Pool whose options are just the session id string."""
+
+    def __init__(self):
+        super().__init__()
+        self.created: list[FakeClient] = []
+        # When set, each creation waits on its own event until the test releases it
+        self.hold_creation = False
+        self.creation_gates: list[asyncio.Event] = []
+        self.creating = 0
+        self.max_creating = 0
+
+    def _get_pool_name(self) -> str:
+        return "FakePool"
+
+    def _get_session_id_from_options(self, options: str) -> str | None:
+        return options
+
+    def _get_session_id_from_client(self, client: FakeClient) -> str | None:
+        return client.options
+
+    async def _create_client_impl(self, task_id: TaskIdentifier, options: str) -> FakeClient:
+        self.creating += 1
+        self.max_creating = max(self.max_creating, self.creating)
+        try:
+            if self.hold_creation:
+                gate = asyncio.Event()
+                self.creation_gates.append(gate)
+                await gate.wait()
+            client = FakeClient(options)
+            self.created.append(client)
+            return client
+        finally:
+            self.creating -= 1
+
+
+async def _settle() -> None:
+    """Let every ready task run until it blocks."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestTaskLocks:
+    """Test per-task lock lifetime against concurrent cleanup."""
+
+    async def test_cleanup_between_release_and_waiter_wakeup(self):
+        """A cleanup landing while a waiter is queued must not split the task lock."""
+        pool = FakePool()
+        pool.hold_creation = True
+        task_id = TaskIdentifier(room_id=1, agent_id=1)
+
+        # A holds the task lock while creating; B queues on it
+        first = asyncio.create_task(pool.get_or_create(task_id, "s1"))
+        await _settle()
+        second = asyncio.create_task(pool.get_or_create(task_id, "s1"))
+        await _settle()
+
+        # Run a cleanup right after A releases the lock, before B wakes up
+        lock = pool._task_locks[task_id]
+        release = lock.release
+
+        def release_then_cleanup():
+            release()
+            lock.release = release
+            pool._schedule_cleanup(task_id)
+
+        lock.release = release_then_cleanup
+        pool.creation_gates[0].set()
+        await first
+        await _settle()
+
+        # B is now creating; C arrives and must wait on the same lock
+        third = asyncio.create_task(pool.get_or_create(task_id, "s1"))
+        await _settle()
+        for gate in pool.creation_gates:
+            gate.set()
+        (client_b, _), (client_c, is_new_c) = await asyncio.gather(second, third)
+        await pool.shutdown_all()
+
+        assert pool.max_creating == 1
+        assert client_c is client_b
+        assert not is_new_c
+        # Every client created was eventually disconnected exactly once
+        assert [client.disconnects for client in pool.created] == [1, 1]
+        assert pool._task_locks == {}
+        assert pool._task_lock_users == {}
+
+
+def _assert_unindexed(pool: FakePool) -> None:
+    assert dict(pool.pool) == {}
+    assert pool._by_room == {}
+    assert pool._by_agent == {}
+    assert pool._task_locks == {}
+    assert pool._task_lock_users == {}
+
+
+class TestPoolLifecycle:
+    """Test that the pool, its indices and task locks stay in step."""
+
+    async def test_create_indexes_client(self):
+        """A new client is pooled and indexed by room and agent."""
+        pool = FakePool()
+        task_id = TaskIdentifier(room_id=1, agent_id=2)
+
+        client, is_new = await pool.get_or_create(task_id, "s1")
+
+        assert is_new
+        assert pool.pool[task_id] is client
+        assert pool._by_room == {1: {task_id}}
+        assert pool._by_agent == {2: {task_id}}
+        assert pool.get_keys_for_agent(2) == [task_id]
+
+    async def test_same_session_reuses_client(self):
+        """A second call with the same session returns the pooled client."""
+        pool = FakePool()
+        task_id = TaskIdentifier(room_id=1, agent_id=2)
+        client, _ = await pool.get_or_create(task_id, "s1")
+
+        again, is_new = await pool.get_or_create(task_id, "s1")
+
+        assert again is client
+        assert not is_new
+        assert len(pool.created) == 1
+
+    async def test_session_change_recreates_client(self):
+        """A different session replaces the pooled client under the same indices."""
+        pool = FakePool()
+        task_id = TaskIdentifier(room_id=1, agent_id=2)
+        old, _ = await pool.get_or_create(task_id, "s1")
+
+        new, is_new = await pool.get_or_create(task_id, "s2")
+
+        assert is_new
+        assert new is not old
+        assert pool.pool[task_id] is new
+        assert pool._by_room == {1: {task_id}}
+        assert pool._by_agent == {2: {task_id}}
+
+    async def test_cleanup_disconnects_and_unindexes(self):
+        """cleanup() detaches the client at once and disconnects it in the background."""
+        pool = FakePool()
+        task_id = TaskIdentifier(room_id=1, agent_id=2)
+        client, _ = await pool.get_or_create(task_id, "s1")
+
+        await pool.cleanup(task_id)
+        _assert_unindexed(pool)
+        await asyncio.gather(*pool._cleanup_tasks)
+
+        assert client.disconnects == 1
+        assert pool._cleanup_tasks == set()
+
+    async def test_cleanup_room_leaves_other_rooms(self):
+        """cleanup_room() removes only that room's clients from every index."""
+        pool = FakePool()
+        kept = TaskIdentifier(room_id=2, agent_id=1)
+        for task_id in (TaskIdentifier(room_id=1, agent_id=1), TaskIdentifier(room_id=1, agent_id=2), kept):
+            await pool.get_or_create(task_id, "s1")
+
+        await pool.cleanup_room(1)
+        await asyncio.gather(*pool._cleanup_tasks)
+
+        assert list(pool.pool) == [kept]
+        assert pool._by_room == {2: {kept}}
+        assert pool._by_agent == {1: {kept}}
+        assert set(pool._task_locks) == {kept}
+        assert [client.disconnects for client in pool.created] == [1, 1, 0]
+
+    async def test_shutdown_all_empties_pool(self):
+        """shutdown_all() disconnects every client and leaves nothing indexed."""
+        pool = FakePool()
+        for room_id, agent_id in ((1, 1), (1, 2), (2, 1)):
+            await pool.get_or_create(TaskIdentifier(room_id=room_id, agent_id=agent_id), "s1")
+        await pool.cleanup(TaskIdentifier(room_id=1, agent_id=1))
+
+        await pool.shutdown_all()
+
+        _assert_unindexed(pool)
+        assert [client.disconnects for client in pool.created] == [1, 1, 1]
+
+
+class FailingClient(FakeClient):
+    """Client whose disconnect raises, optionally after a delay."""
+
+    def __init__(self, options: str, delay: float = 0.0):
+        super().__init__(options)
+        self.delay = delay
+
+    async def disconnect(self) -> None:
+        await asyncio.sleep(self.delay)
+        raise OSError("pipe closed")
+
+
+class TestDisconnectErrors:
+    """Test that failed background disconnects are logged, once."""
+
+    async def _cleanup_failing(self, caplog, delay: float) -> list[str]:
+        pool = FakePool()
+        pool.DISCONNECT_TIMEOUT = 0.01
+        task_id = TaskIdentifier(room_id=1, agent_id=2)
+        pool._pool[task_id] = FailingClient("s1", delay=delay)
+        pool._index_task(task_id)
+        unretrieved = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+
+        with caplog.at_level("WARNING", logger="FakePool"):
+            await pool.cleanup(task_id)
+            await asyncio.sleep(delay + 0.05)
+
+        assert pool._cleanup_tasks == set()
+        assert unretrieved == []
+        return [record.getMessage() for record in caplog.records if "pipe closed" in record.getMessage()]
+
+    async def test_failure_after_timeout_is_logged(self, caplog):
+        """A disconnect failing after its wait timed out is still reported."""
+        errors = await self._cleanup_failing(caplog, delay=0.03)
+
+        assert errors == ["Error in disconnect of room_1_agent_2: pipe closed"]
+
+    async def test_failure_before_timeout_logged_once(self, caplog):
+        """A disconnect failing within the timeout is reported a single time."""
+        errors = await self._cleanup_failing(caplog, delay=0)
+
+        assert errors == ["Error in disconnect of room_1_agent_2: pipe closed"]
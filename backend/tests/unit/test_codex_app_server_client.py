@@ -0,0 +1,72 @@
+"""
+Tests for CodexAppServerClient turn retries.
+
+A turn is retried on a fresh instance only while the app-server has not yet
+accepted it; once turn/start has returned, a dropped transport must not resend
+the input.
+"""
+
+from openai_codex.errors import TransportClosedError
+from providers.codex.app_server_client import CodexAppServerClient, CodexAppServerOptions
+from providers.codex.constants import AppServerMethod, EventType
+
+
+class FakeInstance:
+    """Instance stub whose start_turn fails after a configurable number of events."""
+
+    def __init__(self, accept_turn: bool):
+        self.accept_turn = accept_turn
+        self.start_turn_calls = 0
+        self.shutdown_calls = 0
+        self.is_healthy = True
+
+    def owns_thread(self, thread_id: str) -> bool:
+        return True
+
+    async def start_turn(self, thread_id, input_items, config):
+        self.start_turn_calls += 1
+        if self.accept_turn:
+            # turn/start returned; the transport drops while the model is reasoning
+            yield {"method": AppServerMethod.TURN_STARTED, "params": {"turnId": "turn-1"}}
+        raise TransportClosedError("transport closed")
+
+    async def shutdown(self) -> None:
+        self.shutdown_calls += 1
+
+
+def _make_client(instance: FakeInstance) -> CodexAppServerClient:
+    client = CodexAppServerClient(CodexAppServerOptions(agent_key="room_1_agent_1", thread_id="thread-1"))
+    client.TURN_RETRY_DELAY = 0
+    client._instance = instance
+    client._pending_input_items = [{"type": "text", "text": "hello"}]
+    return client
+
+
+async def _collect(client: CodexAppServerClient) -> list[dict]:
+    return [event async for event in client.receive_response()]
+
+
+class TestTurnRetry:
+    """Test which transport failures resend the turn input."""
+
+    async def test_failure_after_turn_start_is_not_retried(self):
+        """A transport drop after turn/start returned does not run the turn again."""
+        instance = FakeInstance(accept_turn=True)
+        client = _make_client(instance)
+
+        events = await _collect(client)
+
+        assert instance.start_turn_calls == 1
+        assert events[-1]["type"] == EventType.ERROR
+        assert "transport closed" in events[-1]["data"]["message"]
+
+    async def test_failure_before_turn_start_is_retried(self):
+        """A transport drop before the turn was accepted is retried up to the limit."""
+        instance = FakeInstance(accept_turn=False)
+        client = _make_client(instance)
+
+        events = await _collect(client)
+
+        assert instance.start_turn_calls == CodexAppServerClient.MAX_TURN_ATTEMPTS
+        assert instance.shutdown_calls >= CodexAppServerClient.MAX_TURN_ATTEMPTS - 1
+        assert events[-1]["type"] == EventType.ERROR
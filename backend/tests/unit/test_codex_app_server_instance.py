@@ -0,0 +1,129 @@
+"""
+Tests for CodexAppServerInstance failure handling.
+
+The SDK client is replaced with stubs that never answer, so the start and
+RPC timeouts can be exercised without a codex binary.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from providers.codex import app_server_instance
+from providers.codex.app_server_instance import CodexAppServerInstance
+from providers.configs import CodexTurnConfig
+
+
+class FakeProcess:
+    """Subprocess stub that records kill()."""
+
+    pid = 4242
+
+    def __init__(self):
+        self.killed = False
+
+    def poll(self):
+        return -9 if self.killed else None
+
+    def kill(self) -> None:
+        self.killed = True
+
+
+class HangingClient:
+    """AsyncCodexClient stub whose initialize() and requests never return."""
+
+    instances: list["HangingClient"] = []
+
+    def __init__(self, config=None, stderr_error: Exception | None = None):
+        self.closed = False
+        self._stderr_error = stderr_error
+        self._sync = SimpleNamespace(_proc=FakeProcess(), _stderr_tail=self._stderr_tail)
+        HangingClient.instances.append(self)
+
+    def _stderr_tail(self) -> str:
+        if self._stderr_error is not None:
+            raise self._stderr_error
+        return "booting"
+
+    async def start(self) -> None:
+        pass
+
+    async def initialize(self) -> None:
+        await asyncio.Event().wait()
+
+    async def thread_start(self, params):
+        await asyncio.Event().wait()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _make_instance() -> CodexAppServerInstance:
+    instance = CodexAppServerInstance(instance_id=1, agent_key="room_1_agent_1")
+    # Skip resolving the codex binary; the stub client ignores the config
+    instance._build_sdk_config = lambda: SimpleNamespace(codex_bin="codex", config_overrides=())
+    instance.START_TIMEOUT = 0.05
+    instance.RPC_TIMEOUT = 0.05
+    return instance
+
+
+@pytest.fixture
+def hanging_client(monkeypatch):
+    HangingClient.instances = []
+    monkeypatch.setattr(app_server_instance, "AsyncCodexClient", HangingClient)
+    return HangingClient
+
+
+class TestStartTimeout:
+    """Test a start whose initialize handshake never completes."""
+
+    async def test_start_times_out_and_closes_client(self, hanging_client):
+        """A hung initialize raises and closes the spawned client."""
+        instance = _make_instance()
+
+        with pytest.raises(RuntimeError, match="startup timed out"):
+            await instance.start()
+
+        assert hanging_client.instances[0].closed
+        assert not instance.is_started
+
+    async def test_client_closed_when_stderr_tail_fails(self, hanging_client, monkeypatch):
+        """The client is still closed when reading the stderr tail raises."""
+        monkeypatch.setattr(
+            app_server_instance,
+            "AsyncCodexClient",
+            lambda config: HangingClient(config, stderr_error=OSError("pipe gone")),
+        )
+        instance = _make_instance()
+
+        with pytest.raises(RuntimeError, match="startup timed out"):
+            await instance.start()
+
+        assert hanging_client.instances[0].closed
+
+
+class TestRpcTimeout:
+    """Test a JSON-RPC request that never gets a response."""
+
+    async def test_hung_rpc_kills_process(self):
+        """A request past RPC_TIMEOUT kills the app-server, which then reads as unhealthy."""
+        instance = _make_instance()
+        client = HangingClient()
+        instance._client = client
+        assert instance.is_healthy
+
+        with pytest.raises(RuntimeError):
+            await instance.create_thread(CodexTurnConfig())
+
+        assert client._sync._proc.killed
+        assert not instance.is_healthy
+
+    async def test_timeout_error_names_method(self):
+        """The timeout surfaces as a readable error naming the RPC, not a blank TimeoutError."""
+        instance = _make_instance()
+        instance._client = HangingClient()
+
+        with pytest.raises(RuntimeError, match=r"^thread/start timed out after 0.05s$") as exc_info:
+            await instance.create_thread(CodexTurnConfig())
+
+        assert isinstance(exc_info.value.__cause__, TimeoutError)
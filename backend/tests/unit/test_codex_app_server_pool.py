@@ -0,0 +1,231 @@
+"""
+Tests for CodexAppServerPool instance management.
+
+Instances are replaced with in-memory fakes, so no codex processes are spawned.
+"""
+
+import asyncio
+
+import pytest
+from providers.codex import app_server_instance, app_server_pool
+from providers.codex.app_server_pool import CodexAppServerPool, _parse_cpu_groups
+from providers.configs import CodexStartupConfig
+
+
+class FakeInstance:
+    """Stand-in for CodexAppServerInstance with a controllable activity clock."""
+
+    clock = 0.0
+
+    def __init__(self, instance_id, startup_config=None, agent_key=None):
+        self.instance_id = instance_id
+        self.agent_key = agent_key
+        self.alive = False
+        self.shutdowns = 0
+        self.pinned_to = None
+        self.touch()
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.alive
+
+    @property
+    def idle_seconds(self) -> float:
+        return FakeInstance.clock - self.last_activity
+
+    def touch(self) -> None:
+        FakeInstance.clock += 1.0
+        self.last_activity = FakeInstance.clock
+
+    def pin_to_cpus(self, cpus) -> bool:
+        self.pinned_to = cpus
+        return True
+
+    async def start(self) -> None:
+        self.alive = True
+
+    async def shutdown(self) -> None:
+        self.alive = False
+        self.shutdowns += 1
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(app_server_instance, "CodexAppServerInstance", FakeInstance)
+    monkeypatch.delenv("CODEX_CPU_AFFINITY", raising=False)
+    pool = CodexAppServerPool()
+    pool._max_instances = 3
+    return pool
+
+
+async def _create(pool: CodexAppServerPool, agent_key: str) -> FakeInstance:
+    return await pool.get_or_create_instance(agent_key, CodexStartupConfig())
+
+
+async def _settle() -> None:
+    """Let every ready task run until it blocks."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestEviction:
+    """Test least-recently-active eviction at capacity."""
+
+    async def test_evicts_least_recently_active(self, pool):
+        """A touch() moves an instance to the back of the eviction order."""
+        a = await _create(pool, "a")
+        b = await _create(pool, "b")
+        await _create(pool, "c")
+        a.touch()
+
+        await _create(pool, "d")
+
+        assert set(pool._instances) == {"a", "c", "d"}
+        assert b.shutdowns == 1
+        assert a.shutdowns == 0
+
+    async def test_evicted_instance_is_shut_down(self, pool):
+        """The evicted instance's process is shut down."""
+        a = await _create(pool, "a")
+        await _create(pool, "b")
+        await _create(pool, "c")
+
+        await _create(pool, "d")
+
+        assert "a" not in pool._instances
+        assert a.shutdowns == 1
+
+    async def test_starting_instances_count_toward_capacity(self, pool):
+        """Instances still booting take up capacity, so a new one triggers eviction."""
+        await _create(pool, "a")
+        await _create(pool, "b")
+        pool._starting_count = 1
+
+        await _create(pool, "c")
+
+        assert set(pool._instances) == {"b", "c"}
+
+    async def test_below_capacity_evicts_nothing(self, pool):
+        """Nothing is evicted while there is room."""
+        await _create(pool, "a")
+        await _create(pool, "b")
+
+        await _create(pool, "c")
+
+        assert set(pool._instances) == {"a", "b", "c"}
+
+
+class TestAgentLocks:
+    """Test that per-agent creation locks don't outlive their instances."""
+
+    async def test_lock_kept_while_instance_mapped(self, pool):
+        """A mapped instance keeps its lock; no caller is left counted."""
+        await _create(pool, "a")
+
+        assert set(pool._agent_locks) == {"a"}
+        assert pool._agent_lock_users == {}
+
+    async def test_eviction_drops_lock(self, pool):
+        """The evicted agent's lock goes with its instance."""
+        for agent_key in ("a", "b", "c", "d"):
+            await _create(pool, agent_key)
+
+        assert set(pool._agent_locks) == {"b", "c", "d"}
+
+    async def test_idle_cleanup_drops_locks(self, pool):
+        """Reaping idle instances removes their locks."""
+        await _create(pool, "a")
+        await _create(pool, "b")
+        pool._idle_timeout = 0
+        FakeInstance.clock += 10
+
+        await pool._cleanup_idle_instances()
+
+        assert pool._agent_locks == {}
+
+    async def test_failed_start_drops_lock(self, pool, monkeypatch):
+        """A start that raises leaves no lock behind."""
+
+        async def fail(self):
+            raise RuntimeError("spawn failed")
+
+        monkeypatch.setattr(FakeInstance, "start", fail)
+
+        with pytest.raises(RuntimeError, match="spawn failed"):
+            await _create(pool, "a")
+
+        assert pool._agent_locks == {}
+        assert pool._agent_lock_users == {}
+
+    async def test_lock_kept_while_caller_waits(self, pool):
+        """Reaping an instance doesn't drop a lock that a caller is queued on."""
+        a = await _create(pool, "a")
+        a.alive = False
+        lock = pool._agent_locks["a"]
+        await lock.acquire()
+        waiter = asyncio.create_task(_create(pool, "a"))
+        await _settle()
+
+        await pool._cleanup_idle_instances()
+        late = asyncio.create_task(_create(pool, "a"))
+        await _settle()
+
+        assert pool._agent_locks["a"] is lock
+        lock.release()
+        first, second = await asyncio.gather(waiter, late)
+        assert first is second
+        assert pool._agent_lock_users == {}
+
+
+@pytest.fixture
+def available_cpus(monkeypatch):
+    monkeypatch.setattr(app_server_pool.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+
+
+class TestParseCpuGroups:
+    """Test parsing of the CODEX_CPU_AFFINITY spec."""
+
+    def test_ranges_and_lists(self, available_cpus):
+        """Ranges and comma lists both expand to CPU sets."""
+        assert _parse_cpu_groups("[0-3],[4,6]") == [frozenset({0, 1, 2, 3}), frozenset({4, 6})]
+
+    def test_malformed_group_is_skipped(self, available_cpus):
+        """A group that doesn't parse is dropped; the rest are kept."""
+        assert _parse_cpu_groups("[a-b],[1]") == [frozenset({1})]
+
+    def test_unavailable_cpus_are_dropped(self, available_cpus):
+        """CPUs outside the process affinity are removed, and empty groups with them."""
+        assert _parse_cpu_groups("[6-9],[10-11]") == [frozenset({6, 7})]
+
+    def test_empty_spec(self, available_cpus):
+        """An unset spec disables pinning."""
+        assert _parse_cpu_groups("  ") == []
+
+
+class TestCpuPinning:
+    """Test CPU group assignment for new instances."""
+
+    @pytest.fixture
+    def pinned_pool(self, pool, available_cpus):
+        pool._cpu_groups = _parse_cpu_groups("[0-3],[4-7]")
+        pool._max_instances = 2
+        return pool
+
+    async def test_instances_spread_across_groups(self, pinned_pool):
+        """Consecutive instances land on different groups."""
+        a = await _create(pinned_pool, "a")
+        b = await _create(pinned_pool, "b")
+
+        assert {a.pinned_to, b.pinned_to} == set(pinned_pool._cpu_groups)
+
+    async def test_evicted_instance_frees_its_group(self, pinned_pool):
+        """A replacement takes the group freed by eviction, not one still in use."""
+        a = await _create(pinned_pool, "a")
+        b = await _create(pinned_pool, "b")
+        a.touch()
+
+        c = await _create(pinned_pool, "c")
+
+        assert b.shutdowns == 1
+        assert c.pinned_to == b.pinned_to
+        assert c.pinned_to != a.pinned_to
@@ -0,0 +1,32 @@
+"""
+Tests for CodexStartupConfig defaults and override rendering.
+"""
+
+import pytest
+from providers.configs import _DEFAULT_CODEX_CONFIG_OVERRIDES, CodexStartupConfig
+
+
+class TestConfigOverrides:
+    """Test the shared default config overrides."""
+
+    def test_default_is_shared_not_copied(self):
+        """Every config without its own overrides reads the one shared mapping."""
+        first = CodexStartupConfig()
+        second = CodexStartupConfig()
+
+        assert first.config_overrides is _DEFAULT_CODEX_CONFIG_OVERRIDES
+        assert second.config_overrides is first.config_overrides
+
+    def test_default_is_read_only(self):
+        """The shared defaults can't be changed through one config."""
+        config = CodexStartupConfig()
+
+        with pytest.raises(TypeError):
+            config.config_overrides["web_search"] = "live"
+
+    def test_defaults_rendered_as_overrides(self):
+        """Each default is rendered as a key=value override."""
+        overrides = CodexStartupConfig().to_config_overrides()
+
+        assert 'web_search="disabled"' in overrides
+        assert "features.shell_tool=false" in overrides
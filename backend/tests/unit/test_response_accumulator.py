@@ -0,0 +1,89 @@
+"""
+Tests for ResponseAccumulator text accumulation.
+
+update_from_parsed takes the full accumulated text on every message, while
+update_from_delta (used for parsers with emits_deltas) takes only the new text.
+Both must leave the accumulator in the same state and emit the same events.
+"""
+
+from domain.streaming import ContentDeltaEvent, ResponseAccumulator, ThinkingDeltaEvent
+from providers.base import ParsedStreamMessage
+
+# (response delta, thinking delta) per streamed message
+DELTAS = [("", "Let me "), ("", "think."), ("Hello", ""), (", ", ""), ("world", "")]
+
+
+def _feed_deltas(acc: ResponseAccumulator, deltas=DELTAS) -> list:
+    events = []
+    for response, thinking in deltas:
+        events.extend(acc.update_from_delta(ParsedStreamMessage(response, thinking), "temp-1"))
+    return events
+
+
+def _feed_cumulative(acc: ResponseAccumulator, deltas=DELTAS) -> list:
+    events = []
+    response_text = thinking_text = ""
+    for response, thinking in deltas:
+        response_text += response
+        thinking_text += thinking
+        events.extend(acc.update_from_parsed(ParsedStreamMessage(response_text, thinking_text), "temp-1"))
+    return events
+
+
+class TestUpdateFromDelta:
+    """Test the append-only accumulation path."""
+
+    def test_text_accumulates(self):
+        """Deltas are appended to the response and thinking text."""
+        acc = ResponseAccumulator()
+
+        _feed_deltas(acc)
+
+        assert acc.response_text == "Hello, world"
+        assert acc.thinking_text == "Let me think."
+
+    def test_events_carry_each_delta(self):
+        """One event per non-empty delta, carrying exactly that delta."""
+        acc = ResponseAccumulator()
+
+        events = _feed_deltas(acc)
+
+        assert events == [
+            ThinkingDeltaEvent(temp_id="temp-1", delta="Let me "),
+            ThinkingDeltaEvent(temp_id="temp-1", delta="think."),
+            ContentDeltaEvent(temp_id="temp-1", delta="Hello"),
+            ContentDeltaEvent(temp_id="temp-1", delta=", "),
+            ContentDeltaEvent(temp_id="temp-1", delta="world"),
+        ]
+
+    def test_matches_update_from_parsed(self):
+        """Feeding deltas matches feeding the equivalent cumulative text."""
+        delta_acc = ResponseAccumulator()
+        cumulative_acc = ResponseAccumulator()
+
+        delta_events = _feed_deltas(delta_acc)
+        cumulative_events = _feed_cumulative(cumulative_acc)
+
+        assert delta_events == cumulative_events
+        assert delta_acc.get_streaming_state() == cumulative_acc.get_streaming_state()
+
+    def test_skip_hides_content_deltas(self):
+        """After skip, text still accumulates but no content deltas are emitted."""
+        acc = ResponseAccumulator()
+        acc.update_from_delta(ParsedStreamMessage("", "", skip_used=True), "temp-1")
+
+        events = acc.update_from_delta(ParsedStreamMessage("reason for skipping", ""), "temp-1")
+
+        assert events == []
+        assert acc.response_text == "reason for skipping"
+        assert acc.get_streaming_state()["response_text"] == ""
+
+    def test_session_id_picked_up(self):
+        """A message carrying only a session id updates it and emits nothing."""
+        acc = ResponseAccumulator()
+
+        events = acc.update_from_delta(ParsedStreamMessage("", "", session_id="thread-1"), "temp-1")
+
+        assert events == []
+        assert acc.session_id == "thread-1"
+        assert acc.response_text == ""
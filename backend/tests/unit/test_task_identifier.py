@@ -126,3 +126,30 @@ def test_task_identifier_use_in_set():
     assert len(task_set) == 2  # task1 and task2 are the same
     assert task1 in task_set
     assert task3 in task_set
+
+
+def test_task_identifier_cached_hash_matches_fields():
+    """Test the precomputed hash matches hashing the id fields."""
+    task_id = TaskIdentifier(room_id=1, agent_id=2)
+    assert hash(task_id) == hash((1, 2))
+
+
+def test_task_identifier_parsed_key_finds_constructed_key():
+    """Test a parsed TaskIdentifier looks up an entry keyed by a constructed one."""
+    task_dict = {TaskIdentifier(room_id=4, agent_id=9): "value"}
+    assert task_dict[TaskIdentifier.parse("room_4_agent_9")] == "value"
+
+
+def test_task_identifier_cached_hash_hidden():
+    """Test the cached hash stays out of repr and can't be reassigned."""
+    task_id = TaskIdentifier(room_id=1, agent_id=2)
+    assert repr(task_id) == "TaskIdentifier(room_id=1, agent_id=2)"
+    with pytest.raises(AttributeError):
+        task_id._hash = 0
+
+
+def test_task_identifier_slots():
+    """Test TaskIdentifier uses slots rather than a per-instance __dict__."""
+    task_id = TaskIdentifier(room_id=1, agent_id=2)
+    assert not hasattr(task_id, "__dict__")
+    assert set(TaskIdentifier.__slots__) == {"room_id", "agent_id", "_hash"}